@@ -0,0 +1,119 @@
+import axios from 'axios';
+
+// 轮询接口的条件请求缓存：记录每个 URL 最近一次的 ETag 和数据，
+// 下次请求带上 If-None-Match，服务端返回 304 时直接复用本地数据（引用不变，React 不会重新渲染）
+interface Fetched<T> {
+    data: T;
+    changeSeq: number | null;
+    scoreEpoch: string | null;
+    scoreSeq: number | null;
+}
+
+const validators = new Map<string, { etag: string } & Fetched<unknown>>();
+
+async function fetchWithETag<T>(url: string): Promise<Fetched<T>> {
+    const cached = validators.get(url);
+    const res = await axios.get<T>(url, {
+        headers: cached ? { 'If-None-Match': cached.etag } : undefined,
+        validateStatus: (status) => (status >= 200 && status < 300) || status === 304,
+    });
+
+    if (res.status === 304 && cached) {
+        return { data: cached.data as T, changeSeq: cached.changeSeq, scoreEpoch: cached.scoreEpoch, scoreSeq: cached.scoreSeq };
+    }
+
+    const seqHeader = res.headers['x-change-seq'];
+    const changeSeq = seqHeader != null ? Number(seqHeader) : null;
+    const scoreEpoch = res.headers['x-score-epoch'] ?? null;
+    const scoreSeqHeader = res.headers['x-score-seq'];
+    const scoreSeq = scoreSeqHeader ? Number(scoreSeqHeader) : null;
+    const etag = res.headers['etag'];
+    if (etag) {
+        validators.set(url, { etag, data: res.data, changeSeq, scoreEpoch, scoreSeq });
+    }
+    return { data: res.data, changeSeq, scoreEpoch, scoreSeq };
+}
+
+export async function getWithETag<T>(url: string): Promise<T> {
+    return (await fetchWithETag<T>(url)).data;
+}
+
+// ==================== 增量同步 ====================
+
+export interface Change<T> {
+    seq: number;
+    op: 'upsert' | 'delete';
+    key: string;
+    record?: T;
+}
+
+export interface ChangeFeed<T> {
+    seq: number;
+    resync: boolean;
+    changes: Change<T>[];
+    // 当前简历：换简历后所有分数都不可比，需要重新拉全量
+    score_epoch: string;
+    // 分数对应的岗位变更序号（索引预热中为 null）；请求带上的 score_seq 落后时 scores 为全部最新分数
+    score_seq: number | null;
+    scores: Record<string, number | null> | null;
+}
+
+// 列表的本地副本：首次（或服务端要求 resync 时）拉全量，之后只拉 ?since=<seq> 的增量并合并。
+// 分数按全量 IDF 计算，任何岗位变更都会改变所有行的分数：服务端此时在增量里附带 {job_url: 分数}，
+// 由 withScores 就地更新各行，不必重新拉全量
+export class ListSync<T> {
+    private items: T[] = [];
+    private seq: number | null = null;
+    private scoreEpoch: string | null = null;
+    private scoreSeq: number | null = null;
+
+    constructor(
+        private listUrl: string,
+        private changesUrl: string,
+        private keyOf: (item: T) => string,
+        // 返回带新分数的行；分数未变时应返回原对象，保持引用不变
+        private withScores: (item: T, scores: Record<string, number | null>) => T,
+    ) { }
+
+    async refresh(): Promise<T[]> {
+        const { data, changeSeq, scoreEpoch, scoreSeq } = await fetchWithETag<T[]>(this.listUrl);
+        this.items = data;
+        this.seq = changeSeq;
+        this.scoreEpoch = scoreEpoch;
+        this.scoreSeq = scoreSeq;
+        return this.items;
+    }
+
+    async poll(): Promise<T[]> {
+        if (this.seq === null) return this.refresh();
+
+        const params = this.scoreSeq === null ? { since: this.seq } : { since: this.seq, score_seq: this.scoreSeq };
+        const res = await axios.get<ChangeFeed<T>>(this.changesUrl, { params });
+        const feed = res.data;
+        if (feed.resync || feed.score_epoch !== this.scoreEpoch) return this.refresh();
+        this.seq = feed.seq;
+        this.scoreSeq = feed.score_seq;
+        const scores = feed.scores;
+        if (feed.changes.length === 0 && !scores) return this.items;
+
+        const next = scores ? this.items.map(item => this.withScores(item, scores)) : [...this.items];
+        const indexOf = new Map(next.map((item, i) => [this.keyOf(item), i]));
+        const deleted = new Set<string>();
+        for (const change of feed.changes) {
+            const index = indexOf.get(change.key);
+            if (change.op === 'delete') {
+                deleted.add(change.key);
+            } else if (change.record) {
+                deleted.delete(change.key);
+                if (index !== undefined) {
+                    next[index] = change.record;
+                } else {
+                    indexOf.set(change.key, next.length);
+                    next.push(change.record);
+                }
+            }
+        }
+        this.items = deleted.size > 0 ? next.filter(item => !deleted.has(this.keyOf(item))) : next;
+        return this.items;
+    }
+}
@@ -1,11 +1,12 @@
 import React, { useEffect, useState, useMemo } from 'react';
 import { createPortal } from 'react-dom';
 import axios from 'axios';
-import { Download, RefreshCw, Briefcase, Trash2, Filter, Settings, Eye, Copy, Target } from 'lucide-react';
+import { Download, RefreshCw, Briefcase, Trash2, Filter, Settings, Eye, Copy, Target, FileUp, ArrowDownWideNarrow } from 'lucide-react';
 import type { Job } from '../types';
+import { ListSync } from '../api';
 
 // Column definition
-type ColumnId = 'job_title' | 'salary' | 'company_name' | 'location' | 'experience_education' | 'job_tags' | 'benefits' | 'scraped_at' | 'work_address' | 'job_description' | 'recruiter' | 'action';
+type ColumnId = 'job_title' | 'match_score' | 'salary' | 'company_name' | 'location' | 'experience_education' | 'job_tags' | 'benefits' | 'scraped_at' | 'work_address' | 'job_description' | 'recruiter' | 'action';
 
 interface ColumnConfig {
     id: ColumnId;
@@ -18,6 +19,7 @@ interface ColumnConfig {
 const ALL_COLUMNS: ColumnConfig[] = [
     { id: 'job_title', label: '岗位', isFixed: true, width: '200px' },
     { id: 'company_name', label: '公司', isFixed: true, width: '180px' },
+    { id: 'match_score', label: '匹配度', isDefault: true, width: '100px' },
     { id: 'salary', label: '薪资', isDefault: true, width: '140px' },
     { id: 'location', label: '城市', isDefault: true, width: '100px' },
     { id: 'experience_education', label: '经验/学历', isDefault: true, width: '140px' },
@@ -35,6 +37,13 @@ const ALL_COLUMNS: ColumnConfig[] = [
 
 export const JobTable: React.FC = () => {
     const [jobs, setJobs] = useState<Job[]>([]);
+    const [jobSync] = useState(() => new ListSync<Job>(
+        '/api/jobs', '/api/jobs/changes', j => j.job_url,
+        (j, scores) => {
+            const match_score = scores[j.job_url] ?? null;
+            return (j.match_score ?? null) === match_score ? j : { ...j, match_score };
+        },
+    ));
     const [selectedUrls, setSelectedUrls] = useState<Set<string>>(new Set());
     const [isDeleting, setIsDeleting] = useState(false);
 
@@ -53,6 +62,11 @@ export const JobTable: React.FC = () => {
         return defaults;
     });
     const [isColumnMenuOpen, setIsColumnMenuOpen] = useState(false);
+
+    // Resume match state
+    const [resumeHash, setResumeHash] = useState<string | null>(null);
+    const [sortByMatch, setSortByMatch] = useState(false);
+    const resumeInputRef = React.useRef<HTMLInputElement>(null);
     const [activeTooltip, setActiveTooltip] = useState<{ x: number, y: number, content: string } | null>(null);
 
     // Tooltip Timeout Ref
@@ -73,10 +87,10 @@ export const JobTable: React.FC = () => {
         }, 300); // 300ms grace period
     };
 
-    const fetchJobs = async () => {
+    const fetchJobs = async (full = false) => {
         try {
-            const res = await axios.get('/api/jobs');
-            setJobs(res.data);
+            // Poll merges deltas into the local list and refetches in full when the score epoch changes
+            setJobs(await (full ? jobSync.refresh() : jobSync.poll()));
             // Note: We intentionally do NOT clear selectedUrls here
             // User selections should persist across data refreshes
         } catch (err) {
@@ -86,10 +100,31 @@ export const JobTable: React.FC = () => {
 
     useEffect(() => {
         fetchJobs();
-        const interval = setInterval(fetchJobs, 5000);
+        axios.get('/api/match/resume')
+            .then(res => setResumeHash(res.data.resume?.resume_hash ?? null))
+            .catch(() => { });
+        const interval = setInterval(() => fetchJobs(), 5000);
         return () => clearInterval(interval);
     }, []);
 
+    const handleResumeUpload = async (e: React.ChangeEvent<HTMLInputElement>) => {
+        const file = e.target.files?.[0];
+        e.target.value = '';
+        if (!file) return;
+
+        const form = new FormData();
+        form.append('file', file);
+        try {
+            const res = await axios.post('/api/match/resume', form);
+            setResumeHash(res.data.resume_hash);
+            setSortByMatch(true);
+            await fetchJobs(true);
+        } catch (err) {
+            console.error("Resume upload failed", err);
+            alert("简历上传失败，请上传 UTF-8 文本 (.txt / .md)");
+        }
+    };
+
     // Derived Data
     const uniqueCompanies = useMemo(() => {
         // Extract unique, non-empty company names
@@ -98,9 +133,10 @@ export const JobTable: React.FC = () => {
     }, [jobs]);
 
     const filteredJobs = useMemo(() => {
-        if (selectedCompanies.size === 0) return jobs;
-        return jobs.filter(j => selectedCompanies.has(j.company_name));
-    }, [jobs, selectedCompanies]);
+        const result = selectedCompanies.size === 0 ? jobs : jobs.filter(j => selectedCompanies.has(j.company_name));
+        if (!sortByMatch) return result;
+        return [...result].sort((a, b) => (b.match_score ?? 0) - (a.match_score ?? 0));
+    }, [jobs, selectedCompanies, sortByMatch]);
 
     // Toggle company in multi-select filter
     const toggleCompanyFilter = (company: string) => {
@@ -114,7 +150,7 @@ export const JobTable: React.FC = () => {
     };
 
 
-    const handleExport = (format: 'json' | 'csv') => {
+    const handleExport = (format: 'json' | 'csv' | 'parquet') => {
         window.open(`http://localhost:8000/api/export?format=${format}`, '_blank');
     };
 
@@ -167,7 +203,22 @@ export const JobTable: React.FC = () => {
         switch (colId) {
             case 'job_title':
                 return (
-                    <div className="font-medium text-gray-900">{job.job_title}</div>
+                    <div className="font-medium text-gray-900 flex items-center gap-1">
+                        {job.job_title}
+                        {job.duplicate_of && (
+                            <a href={job.duplicate_of} target="_blank" rel="noopener noreferrer" title={`与已有岗位 JD 近似重复: ${job.duplicate_of}`}
+                                className="text-[10px] px-1.5 py-0.5 bg-orange-50 text-orange-600 rounded border border-orange-100 shrink-0">
+                                重复
+                            </a>
+                        )}
+                    </div>
+                );
+            case 'match_score':
+                if (job.match_score == null) return <span className="text-xs text-gray-300">-</span>;
+                return (
+                    <span className={`text-xs font-bold px-2 py-1 rounded-md ${job.match_score >= 30 ? 'bg-indigo-50 text-indigo-600' : 'bg-gray-50 text-gray-500'}`}>
+                        {job.match_score.toFixed(1)}
+                    </span>
                 );
             case 'salary':
                 return (
@@ -408,7 +459,16 @@ export const JobTable: React.FC = () => {
                         )}
                     </div>
 
-                    <button onClick={() => fetchJobs()} className="p-2 hover:bg-gray-100 rounded-lg transition-colors text-gray-500 hover:text-gray-900" title="Refresh">
+                    <input ref={resumeInputRef} type="file" accept=".txt,.md,text/plain,text/markdown" className="hidden" onChange={handleResumeUpload} />
+                    <button
+                        onClick={() => resumeInputRef.current?.click()}
+                        className={`p-2 rounded-lg transition-colors hover:text-gray-900 ${resumeHash ? 'bg-indigo-50 text-indigo-600' : 'hover:bg-gray-100 text-gray-500'}`}
+                        title={resumeHash ? `当前简历: ${resumeHash}（点击更换）` : '上传简历计算匹配度'}
+                    >
+                        <FileUp size={18} />
+                    </button>
+
+                    <button onClick={() => fetchJobs(true)} className="p-2 hover:bg-gray-100 rounded-lg transition-colors text-gray-500 hover:text-gray-900" title="Refresh">
                         <RefreshCw size={18} />
                     </button>
                     <button
@@ -417,6 +477,13 @@ export const JobTable: React.FC = () => {
                     >
                         <Download size={16} /> 导出 CSV
                     </button>
+                    <button
+                        onClick={() => handleExport('parquet')}
+                        className="flex items-center gap-2 px-4 py-2 bg-white border border-gray-200 text-gray-700 rounded-lg text-sm font-medium hover:bg-gray-50 hover:border-gray-300 transition-all shadow-sm"
+                        title="列式格式，适合 Pandas / DuckDB / BI 工具"
+                    >
+                        <Download size={16} /> Parquet
+                    </button>
                 </div>
             </div>
 
@@ -512,6 +579,21 @@ export const JobTable: React.FC = () => {
                                     );
                                 }
 
+                                if (col.id === 'match_score') {
+                                    return (
+                                        <th key={col.id} className={`px-4 py-3 text-left text-xs font-semibold text-gray-500 uppercase tracking-wider ${stickyClass}`} style={{ ...stickyStyle, minWidth: col.width, maxWidth: col.width, width: col.width }}>
+                                            <div
+                                                className={`flex items-center gap-1 cursor-pointer hover:text-blue-600 ${sortByMatch ? 'text-blue-600' : ''}`}
+                                                onClick={() => setSortByMatch(!sortByMatch)}
+                                                title="按匹配度排序"
+                                            >
+                                                {col.label}
+                                                <ArrowDownWideNarrow size={14} />
+                                            </div>
+                                        </th>
+                                    );
+                                }
+
                                 return (
                                     <th key={col.id} className={`px-4 py-3 text-left text-xs font-semibold text-gray-500 uppercase tracking-wider ${stickyClass}`} style={{ ...stickyStyle, minWidth: col.width, maxWidth: col.width, width: col.width }}>
                                         {col.label}
@@ -555,7 +637,7 @@ export const JobTable: React.FC = () => {
                         ))}
                         {filteredJobs.length === 0 && (
                             <tr>
-                                <td colSpan={12}>
+                                <td colSpan={13}>
                                     <div className="text-center py-12 text-gray-500 flex flex-col items-center">
                                         <div className="w-16 h-16 bg-gray-100 rounded-full flex items-center justify-center mb-4 text-gray-400">
                                             <Briefcase size={24} />
@@ -0,0 +1,100 @@
+import React, { useEffect, useState } from 'react';
+import axios from 'axios';
+import { X, Copy, ExternalLink } from 'lucide-react';
+import type { Task } from '../types';
+
+interface SkippedTasksModalProps {
+    isOpen: boolean;
+    onClose: () => void;
+}
+
+// Tasks submitted with dedup_mode=skip whose JD was a near-duplicate of an existing job
+export const SkippedTasksModal: React.FC<SkippedTasksModalProps> = ({ isOpen, onClose }) => {
+    const [tasks, setTasks] = useState<Task[]>([]);
+    const [loading, setLoading] = useState(false);
+
+    useEffect(() => {
+        if (isOpen) {
+            fetchSkippedTasks();
+        }
+    }, [isOpen]);
+
+    const fetchSkippedTasks = async () => {
+        setLoading(true);
+        try {
+            const res = await axios.get('/api/tasks/skipped');
+            setTasks(res.data);
+        } catch (error) {
+            console.error("Failed to fetch skipped tasks", error);
+        } finally {
+            setLoading(false);
+        }
+    };
+
+    if (!isOpen) return null;
+
+    return (
+        <div className="fixed inset-0 z-50 flex items-center justify-center p-4 bg-black/50 backdrop-blur-sm">
+            <div className="bg-white/90 backdrop-blur-md rounded-2xl shadow-2xl w-full max-w-4xl max-h-[80vh] flex flex-col border border-white/20">
+                {/* Header */}
+                <div className="p-6 border-b border-gray-200/50 flex justify-between items-center">
+                    <div className="flex items-center gap-3">
+                        <div className="p-2 bg-slate-100 rounded-lg text-slate-600">
+                            <Copy className="h-6 w-6" />
+                        </div>
+                        <div>
+                            <h2 className="text-xl font-bold text-gray-900">Skipped Duplicates</h2>
+                            <p className="text-sm text-gray-500">Near-duplicate JDs that were not saved ({tasks.length} total)</p>
+                        </div>
+                    </div>
+                    <button onClick={onClose} className="p-2 hover:bg-gray-100 rounded-full transition-colors text-gray-500">
+                        <X className="h-5 w-5" />
+                    </button>
+                </div>
+
+                {/* Content */}
+                <div className="flex-1 overflow-y-auto p-6">
+                    {loading ? (
+                        <div className="flex justify-center p-8 text-gray-500">Loading skipped tasks...</div>
+                    ) : tasks.length === 0 ? (
+                        <div className="text-center p-12 text-gray-500">No skipped tasks.</div>
+                    ) : (
+                        <div className="space-y-3">
+                            {tasks.map((task) => (
+                                <div key={task.id} className="p-4 rounded-xl border bg-white border-gray-100 flex items-start gap-4">
+                                    <div className="flex-1 min-w-0">
+                                        <p className="font-medium text-gray-900 break-all line-clamp-1" title={task.url}>{task.url}</p>
+                                        {task.duplicate_of && (
+                                            <a
+                                                href={task.duplicate_of}
+                                                target="_blank"
+                                                rel="noopener noreferrer"
+                                                className="text-xs text-slate-600 mt-1 inline-flex items-center gap-1 bg-slate-50 px-2 py-0.5 rounded break-all hover:text-slate-900"
+                                            >
+                                                重复于: {task.duplicate_of}
+                                                <ExternalLink className="h-3 w-3 shrink-0" />
+                                            </a>
+                                        )}
+                                    </div>
+                                    <div className="text-xs text-gray-400 whitespace-nowrap mt-1">
+                                        {new Date(task.updated_at).toLocaleTimeString()}
+                                    </div>
+                                </div>
+                            ))}
+                        </div>
+                    )}
+                </div>
+
+                {/* Footer */}
+                <div className="p-6 border-t border-gray-200/50 flex justify-end gap-3 bg-gray-50/50 rounded-b-2xl">
+                    <button
+                        onClick={onClose}
+                        className="px-4 py-2 text-gray-600 font-medium hover:bg-gray-200/50 rounded-lg transition-colors"
+                    >
+                        Close
+                    </button>
+                </div>
+            </div>
+        </div>
+    );
+};
@@ -1,18 +1,19 @@
 import React, { useEffect, useState } from 'react';
-import axios from 'axios';
-import { Activity, CheckCircle, XCircle, Clock } from 'lucide-react';
+import { Activity, CheckCircle, XCircle, Clock, Copy } from 'lucide-react';
 import type { TaskStatus } from '../types';
+import { getWithETag } from '../api';
 
 import { FailedTasksModal } from './FailedTasksModal';
+import { SkippedTasksModal } from './SkippedTasksModal';
 
 export const StatusDashboard: React.FC = () => {
     const [status, setStatus] = useState<TaskStatus | null>(null);
     const [isRetryModalOpen, setIsRetryModalOpen] = useState(false);
+    const [isSkippedModalOpen, setIsSkippedModalOpen] = useState(false);
 
     const fetchStatus = async () => {
         try {
-            const res = await axios.get('/api/tasks/status');
-            setStatus(res.data);
+            setStatus(await getWithETag<TaskStatus>('/api/tasks/status'));
         } catch (error) {
             console.error("Failed to fetch status", error);
         }
@@ -40,6 +41,18 @@ export const StatusDashboard: React.FC = () => {
             onClick: () => setIsRetryModalOpen(true),
             cursor: 'cursor-pointer hover:bg-rose-50'
         },
+        {
+            // Near-duplicate JDs dropped by dedup_mode=skip
+            label: '重复跳过 (Skipped)',
+            value: status.skipped_count,
+            icon: Copy,
+            color: 'text-slate-600',
+            bg: 'bg-slate-100/50',
+            border: 'border-slate-200',
+            onClick: () => setIsSkippedModalOpen(true),
+            cursor: 'cursor-pointer hover:bg-slate-50',
+            span: 'col-span-2'
+        },
     ];
 
     return (
@@ -50,7 +63,7 @@ export const StatusDashboard: React.FC = () => {
                         key={card.label}
                         onClick={card.onClick}
                         className={`glass-card p-5 flex flex-col justify-between relative overflow-hidden group hover:scale-[1.02] transition-transform duration-300 
-                            ${card.border} border-l-4 ${card.cursor || 'cursor-default'}`}
+                            ${card.border} border-l-4 ${card.cursor || 'cursor-default'} ${card.span || ''}`}
                     >
                         <div className="flex justify-between items-start">
                             <div className={`p-2 rounded-lg ${card.bg}`}>
@@ -79,6 +92,11 @@ export const StatusDashboard: React.FC = () => {
                 onClose={() => setIsRetryModalOpen(false)}
                 onRetrySuccess={fetchStatus}
             />
+
+            <SkippedTasksModal
+                isOpen={isSkippedModalOpen}
+                onClose={() => setIsSkippedModalOpen(false)}
+            />
         </>
     );
 };
@@ -6,13 +6,14 @@ export const TaskSubmit: React.FC = () => {
     const [urls, setUrls] = useState('');
     const [loading, setLoading] = useState(false);
     const [message, setMessage] = useState('');
+    const [dedupMode, setDedupMode] = useState<'flag' | 'skip' | 'off'>('flag');
 
     const handleSubmit = async () => {
         if (!urls.trim()) return;
         setLoading(true);
         try {
             const urlList = urls.split('\n').map(u => u.trim()).filter(u => u);
-            const res = await axios.post('/api/tasks/submit', { urls: urlList });
+            const res = await axios.post('/api/tasks/submit', { urls: urlList, dedup_mode: dedupMode });
             setMessage(`Success: ${res.data.message}`);
             setUrls('');
             setTimeout(() => setMessage(''), 3000);
@@ -47,6 +48,16 @@ export const TaskSubmit: React.FC = () => {
                     </div>
                 </div>
 
+                <select
+                    value={dedupMode}
+                    onChange={(e) => setDedupMode(e.target.value as 'flag' | 'skip' | 'off')}
+                    className="px-3 py-2 text-sm bg-gray-50/50 border border-gray-200 rounded-xl text-gray-600 outline-none focus:ring-2 focus:ring-blue-500/20"
+                >
+                    <option value="flag">重复 JD：标记</option>
+                    <option value="skip">重复 JD：跳过不保存</option>
+                    <option value="off">重复 JD：不检测</option>
+                </select>
+
                 <button
                     onClick={handleSubmit}
                     disabled={loading || !urls.trim()}
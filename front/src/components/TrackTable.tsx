@@ -2,6 +2,7 @@ import React, { useEffect, useState, useMemo } from 'react';
 import axios from 'axios';
 import { Trash2, Undo2, FileText, ExternalLink } from 'lucide-react';
 import type { TrackedJob, TrackStatus, Priority } from '../types';
+import { ListSync } from '../api';
 
 // 状态颜色映射
 const STATUS_COLORS: Record<TrackStatus, string> = {
@@ -33,6 +34,13 @@ interface UndoItem {
 
 export const TrackTable: React.FC = () => {
     const [jobs, setJobs] = useState<TrackedJob[]>([]);
+    const [trackSync] = useState(() => new ListSync<TrackedJob>(
+        '/api/track/list', '/api/track/changes', j => j.job_id,
+        (j, scores) => {
+            const match_score = scores[j.job_url] ?? null;
+            return (j.analysis_tags?.match_score ?? null) === match_score ? j : { ...j, analysis_tags: { ...j.analysis_tags, match_score } };
+        },
+    ));
     const [selectedIds, setSelectedIds] = useState<Set<string>>(new Set());
     const [undoItem, setUndoItem] = useState<UndoItem | null>(null);
     const [editingNotes, setEditingNotes] = useState<string | null>(null);
@@ -42,8 +50,7 @@ export const TrackTable: React.FC = () => {
 
     const fetchJobs = async () => {
         try {
-            const res = await axios.get('/api/track/list');
-            setJobs(res.data);
+            setJobs(await trackSync.poll());
         } catch (err) {
             console.error("Failed to fetch tracked jobs", err);
         }
@@ -201,6 +208,7 @@ export const TrackTable: React.FC = () => {
                             </th>
                             <th className="px-4 py-3 text-left text-xs font-semibold text-gray-500 uppercase">岗位</th>
                             <th className="px-4 py-3 text-left text-xs font-semibold text-gray-500 uppercase">公司</th>
+                            <th className="px-4 py-3 text-left text-xs font-semibold text-gray-500 uppercase">匹配度</th>
                             <th className="px-4 py-3 text-left text-xs font-semibold text-gray-500 uppercase">状态</th>
                             <th className="px-4 py-3 text-left text-xs font-semibold text-gray-500 uppercase">优先级</th>
                             <th className="px-4 py-3 text-left text-xs font-semibold text-gray-500 uppercase">添加时间</th>
@@ -246,6 +254,11 @@ export const TrackTable: React.FC = () => {
                                 {/* 公司 */}
                                 <td className="px-4 py-3 text-gray-700">{job.company_name}</td>
 
+                                {/* 匹配度 - 上传简历后由后端填充 */}
+                                <td className="px-4 py-3 text-xs text-gray-500">
+                                    {job.analysis_tags?.match_score != null ? job.analysis_tags.match_score.toFixed(1) : '-'}
+                                </td>
+
                                 {/* 状态 - 下拉选择 */}
                                 <td className="px-4 py-3">
                                     <select
@@ -340,7 +353,7 @@ export const TrackTable: React.FC = () => {
 
                         {filteredJobs.length === 0 && (
                             <tr>
-                                <td colSpan={10} className="px-4 py-12 text-center text-gray-500">
+                                <td colSpan={11} className="px-4 py-12 text-center text-gray-500">
                                     <div className="flex flex-col items-center">
                                         <FileText size={32} className="text-gray-300 mb-2" />
                                         <p className="font-medium">暂无追踪岗位</p>
@@ -18,7 +18,12 @@ export interface Job {
         status: string;
     };
     job_url: string;
+    job_id?: string;
     scraped_at?: string;
+    // 简历匹配度 (0-100)，仅在上传简历后返回
+    match_score?: number | null;
+    // 近似重复 JD 的已有岗位 URL（提交时 dedup_mode=flag）
+    duplicate_of?: string;
 }
 
 export interface TaskStatus {
@@ -26,14 +31,16 @@ export interface TaskStatus {
     active_task: string | null;
     completed_count: number;
     failed_count: number;
+    skipped_count: number;
     total_tasks: number;
 }
 
 export interface Task {
     id: string;
     url: string;
-    status: 'pending' | 'processing' | 'completed' | 'failed';
+    status: 'pending' | 'processing' | 'completed' | 'failed' | 'skipped';
     error?: string;
+    duplicate_of?: string | null;
     created_at: string;
     updated_at: string;
 }
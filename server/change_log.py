@@ -0,0 +1,107 @@
+"""
+Change Log - JSON 存储的增量变更日志
+每次 upsert / delete 追加一条带递增序号的记录，客户端用 ?since=<seq> 只拉取增量。
+日志只保留最近 MAX_ENTRIES 条，更早的部分被压缩掉；落后于压缩水位的客户端需要全量重新同步。
+多 worker 时序号的分配和追加在日志文件锁内完成，各进程通过增量读取日志保持一致。
+"""
+import json
+import os
+from collections import deque
+from typing import Optional, List, Dict, Any
+
+from store_lock import store_lock, JsonlFollower
+
+MAX_ENTRIES = 2000
+
+
+class ChangeLog:
+    def __init__(self, log_file: str, max_entries: int = MAX_ENTRIES):
+        self.log_file = log_file
+        self.max_entries = max_entries
+        self.entries: deque = deque()
+        self.last_seq = 0
+        self.horizon = 0  # since < horizon 的请求无法用增量满足
+        self._follower = JsonlFollower(log_file)
+        with store_lock(self.log_file):
+            self._refresh()
+
+    def _refresh(self) -> None:
+        """读取其他进程追加的记录（调用方持有日志锁）"""
+        reset, lines = self._follower.read_new()
+        if reset:
+            self.entries.clear()
+            self.last_seq = self.horizon = 0
+        for entry in lines:
+            if 'horizon' in entry:
+                self.horizon = self.last_seq = entry['horizon']
+                continue
+            self.entries.append(entry)
+            self.last_seq = entry['seq']
+        while len(self.entries) > 2 * self.max_entries:
+            self.entries.popleft()  # 内存里不必保留超过压缩阈值的部分
+
+    def _compact(self) -> None:
+        """丢弃最旧的记录，并把新的水位写在日志开头"""
+        while len(self.entries) > self.max_entries:
+            self.horizon = self.entries.popleft()['seq']
+        tmp_file = self.log_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'horizon': self.horizon}) + '\n')
+            for entry in self.entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        os.replace(tmp_file, self.log_file)
+
+    def record(self, op: str, key: str, record: Optional[Dict[str, Any]] = None) -> int:
+        """记录一次变更，op 为 'upsert'（附带完整记录）或 'delete'，返回序号"""
+        return self.record_many([(op, key, record)])
+
+    def record_many(self, changes: List[tuple]) -> int:
+        with store_lock(self.log_file):
+            self._refresh()
+            lines = []
+            for op, key, record in changes:
+                self.last_seq += 1
+                entry = {'seq': self.last_seq, 'op': op, 'key': key}
+                if op == 'upsert':
+                    entry['record'] = record
+                self.entries.append(entry)
+                lines.append(json.dumps(entry, ensure_ascii=False) + '\n')
+            with open(self.log_file, 'a', encoding='utf-8') as f:
+                f.writelines(lines)
+            if len(self.entries) > 2 * self.max_entries:
+                self._compact()
+            self._follower.mark_written()
+            return self.last_seq
+
+    def invalidate(self) -> int:
+        """存储被整体改写（如 schema 迁移）后调用：水位抬到新序号之后，所有增量请求都返回 resync"""
+        with store_lock(self.log_file):
+            self._refresh()
+            self.last_seq += 1
+            self.horizon = self.last_seq
+            self.entries.clear()
+            self._compact()
+            self._follower.mark_written()
+            return self.last_seq
+
+    def current_seq(self) -> int:
+        with store_lock(self.log_file):
+            self._refresh()
+            return self.last_seq
+
+    def since(self, seq: int) -> Dict[str, Any]:
+        """
+        返回 seq 之后的变更；同一 key 只保留最后一次。
+        seq 早于压缩水位或晚于当前序号（日志被重建）时返回 resync=True。
+        """
+        with store_lock(self.log_file):
+            self._refresh()
+            if seq < self.horizon or seq > self.last_seq or (self.entries and seq < self.entries[0]['seq'] - 1):
+                return {'seq': self.last_seq, 'resync': True, 'changes': []}
+            latest: Dict[str, Dict[str, Any]] = {}
+            for entry in reversed(self.entries):
+                if entry['seq'] <= seq:
+                    break
+                latest.setdefault(entry['key'], entry)
+            changes = sorted(latest.values(), key=lambda e: e['seq'])
+            return {'seq': self.last_seq, 'resync': False, 'changes': changes}
@@ -0,0 +1,149 @@
+"""
+Columnar Export - Parquet / Arrow IPC 导出
+保留嵌套结构：job_tags / benefits 为 list<string>，recruiter 为 struct，scraped_at 为 timestamp。
+从岗位存储流式读取并按 row group 分批转换写出，内存占用与批大小相关而不是与总量相关；
+生成的文件按岗位存储版本缓存，版本不变时重复下载直接复用。
+"""
+import glob
+import itertools
+import os
+import time
+from datetime import datetime
+from typing import Dict, Any, Iterable, Iterator
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from store_lock import store_lock, iter_records
+
+EXPORT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../exports"))
+BATCH_SIZE = 5000
+# 旧版本文件在被取代后保留的时间，留给已拿到旧路径、尚未开始发送的下载
+STALE_GRACE_SECONDS = 600
+
+FORMATS = {
+    # format -> (扩展名, MIME)
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+    "arrow": ("arrow", "application/vnd.apache.arrow.file"),
+}
+
+JOB_SCHEMA = pa.schema([
+    ("job_url", pa.string()),
+    ("job_id", pa.string()),
+    ("job_title", pa.string()),
+    ("salary", pa.string()),
+    ("company_name", pa.string()),
+    ("company_industry", pa.string()),
+    ("company_size", pa.string()),
+    ("company_financing", pa.string()),
+    ("location", pa.string()),
+    ("work_address", pa.string()),
+    ("experience_required", pa.string()),
+    ("education_required", pa.string()),
+    ("job_tags", pa.list_(pa.string())),
+    ("benefits", pa.list_(pa.string())),
+    ("job_description", pa.string()),
+    ("recruiter", pa.struct([
+        ("name", pa.string()),
+        ("title", pa.string()),
+        ("status", pa.string()),
+    ])),
+    ("scraped_at", pa.timestamp("s")),
+    ("duplicate_of", pa.string()),
+])
+
+def _parse_time(value: Any):
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d %H:%M:%S')
+    except (TypeError, ValueError):
+        return None
+
+
+def _row(job: Dict[str, Any]) -> Dict[str, Any]:
+    """按 schema 取字段，缺失或类型不符的值置空，避免单条脏数据导致整批失败"""
+    row = {}
+    for field in JOB_SCHEMA:
+        value = job.get(field.name)
+        if pa.types.is_list(field.type):
+            value = [str(v) for v in value] if isinstance(value, list) else None
+        elif pa.types.is_struct(field.type):
+            value = {k: str(value.get(k, '')) for k in ('name', 'title', 'status')} if isinstance(value, dict) else None
+        elif pa.types.is_timestamp(field.type):
+            value = _parse_time(value)
+        elif value is not None:
+            value = str(value)
+        row[field.name] = value
+    return row
+
+
+def _batches(jobs: Iterable[Dict[str, Any]]) -> Iterator[pa.RecordBatch]:
+    jobs = iter(jobs)
+    while True:
+        rows = [_row(job) for job in itertools.islice(jobs, BATCH_SIZE)]
+        if not rows:
+            return
+        yield pa.RecordBatch.from_pylist(rows, schema=JOB_SCHEMA)
+
+
+def _read_jobs(data_file: str) -> Iterator[Dict[str, Any]]:
+    if os.path.exists(data_file):
+        for job, _ in iter_records(data_file):
+            yield job
+
+
+def write_jobs(jobs: Iterable[Dict[str, Any]], path: str, fmt: str) -> None:
+    """写出单个列式文件，每批一个 row group / record batch"""
+    if fmt == "parquet":
+        with pq.ParquetWriter(path, JOB_SCHEMA, compression="zstd") as writer:
+            for batch in _batches(jobs):
+                writer.write_batch(batch, row_group_size=BATCH_SIZE)
+    else:
+        options = ipc.IpcWriteOptions(compression="zstd")
+        with pa.OSFile(path, "wb") as sink, ipc.new_file(sink, JOB_SCHEMA, options=options) as writer:
+            for batch in _batches(jobs):
+                writer.write_batch(batch)
+
+
+def export_jobs(data_file: str, version_tag: str, fmt: str) -> str:
+    """
+    返回指定版本的导出文件路径；缓存未命中时才持有存储锁逐条读取 data_file 生成，
+    整个岗位列表不会同时驻留内存。同一格式的旧版本文件会被清理。
+    """
+    ext, _ = FORMATS[fmt]
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    path = os.path.join(EXPORT_DIR, f"job_details.{version_tag}.{ext}")
+
+    with store_lock(os.path.join(EXPORT_DIR, f"job_details.{ext}")):  # 多个 worker 不重复生成同一版本
+        if os.path.exists(path):
+            return path
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with store_lock(data_file):  # 读取期间不能被写入者替换
+            write_jobs(_read_jobs(data_file), tmp_path, fmt)
+        os.replace(tmp_path, path)
+
+        _remove_superseded(ext)
+    return path
+
+
+def _remove_superseded(ext: str) -> None:
+    """
+    删除旧版本文件。其他 worker 可能刚把旧路径交给 FileResponse 还没打开，
+    因此只删除被新版本取代超过 STALE_GRACE_SECONDS 的文件（以取代它的下一个版本的生成时间为准）。
+    """
+    files = []
+    for candidate in glob.glob(os.path.join(EXPORT_DIR, f"job_details.*.{ext}")):
+        try:
+            files.append((os.path.getmtime(candidate), candidate))
+        except OSError:
+            continue
+    files.sort()
+    now = time.time()
+    for (_, stale), (superseded_at, _) in zip(files, files[1:]):
+        if now - superseded_at > STALE_GRACE_SECONDS:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass  # 可能正在被下载（Windows）或已被其他 worker 删除
@@ -1,5 +1,6 @@
 import asyncio
 from playwright.async_api import async_playwright
+from extractor import install as install_extractor, extract, FIELD_SPECS
 
 # Test URL from user's logs
 TEST_URL = "https://www.zhipin.com/job_detail/7a3ee13890e50b9303xy09W9E1pX.html"
@@ -11,6 +12,7 @@ async def main():
         context = await browser.new_context(
             user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
         )
+        await install_extractor(context)
         page = await context.new_page()
         
         print(f"Navigating to {TEST_URL}...")
@@ -23,38 +25,24 @@ async def main():
             print("Network idle timeout, proceeding anyway...")
             
         await asyncio.sleep(5)
-        
-        # Scroll to ensure lazy content loads
-        await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-        await asyncio.sleep(2)
-        
-        # Test the new extraction logic
-        company_name = await page.evaluate('''() => {
-            const getCompanyName = () => {
-               // Strategy 1: Specific KA attribute (most precise)
-               let el = document.querySelector('.sider-company .company-info a[ka="job-detail-company_custompage"]');
-               if (el && el.innerText.trim()) return el.innerText.trim();
-               
-               // Strategy 2: Iterate sidebar links, ignore logo (img)
-               const links = document.querySelectorAll('.sider-company .company-info a');
-               for (const link of links) {
-                   if (link.innerText.trim() && !link.querySelector('img')) {
-                       return link.innerText.trim();
-                   }
-               }
-               
-               // Strategy 3: Business Info Section (Full registered name)
-               el = document.querySelector('.level-list .company-name');
-               if (el) {
-                   return el.innerText.replace('公司名称', '').trim();
-               }
-               
-               return 'FAILED TO FIND COMPANY NAME';
-            };
-            return getCompanyName();
-        }''')
-        
-        print(f"EXTRACTED COMPANY NAME: {company_name}")
+
+        # Run the same field specs as the scraper, with a per-field report of which strategy matched
+        result = await extract(page, snippet=True, trace=True)
+
+        print(f"Title: {result['title']}  URL: {result['url']}  Blocked: {result['blocked']}  Extractor: v{result['version']}")
+        if result['error']:
+            print(f"EXTRACTION ERROR: {result['error']}")
+            await browser.close()
+            return
+        for field, strategy in result['trace'].items():
+            value = result['fields']
+            for part in field.split('.'):
+                value = value[part]
+            status = f"strategy {strategy + 1}/{len(FIELD_SPECS[field])}" if strategy >= 0 else "FAILED"
+            print(f"{field:<22} [{status}] {str(value)[:80]!r}")
+
+        if not result['fields']['job_title']:
+            print(f"Content snippet: {result['snippet']}")
 
         await browser.close()
 
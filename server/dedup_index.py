@@ -0,0 +1,240 @@
+"""
+Dedup Index - 基于 MinHash + LSH 的近似重复 JD 检测
+同一岗位常以不同 URL 重复出现（重新发布、不同招聘者、外包代招），JD 文本几乎一致。
+每条记录保存时计算 MinHash 签名并按 band 分桶，查询只需比较同桶候选，复杂度与总量无关。
+签名以追加日志 (JSONL) 形式与岗位数据文件放在一起持久化；多 worker 时各进程在日志锁内增量读取彼此追加的记录。
+"""
+import base64
+import json
+import os
+import re
+import threading
+import zlib
+from contextlib import contextmanager
+from typing import Optional, List, Dict, Set, Any
+
+import numpy as np
+
+from store_lock import store_lock, JsonlFollower
+
+NUM_PERM = 128
+BANDS = 16              # 16 band x 8 行，候选阈值约为 Jaccard 0.7
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 5        # 字符级 5-gram，中文 JD 不依赖分词
+THRESHOLD = 0.8         # 估算 Jaccard 达到该值才判定为重复
+
+_MERSENNE = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+_rng = np.random.RandomState(1)  # 固定种子，保证持久化的签名在重启后仍可比较
+_PERM_A = _rng.randint(1, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+
+_NORMALIZE_RE = re.compile(r'[\W_]+', re.UNICODE)
+
+
+def shingles(text: str) -> np.ndarray:
+    """去掉空白和标点后取字符 k-gram，返回去重后的 32 位哈希"""
+    text = _NORMALIZE_RE.sub('', (text or '').lower())
+    if not text:
+        return np.zeros(0, dtype=np.uint64)
+    if len(text) <= SHINGLE_SIZE:
+        grams = [text]
+    else:
+        grams = [text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)]
+    return np.unique(np.fromiter((zlib.crc32(g.encode('utf-8')) for g in grams), dtype=np.uint64, count=len(grams)))
+
+
+def minhash(text: str) -> Optional[np.ndarray]:
+    """计算 NUM_PERM 维 MinHash 签名，文本为空时返回 None"""
+    hashes = shingles(text)
+    if hashes.size == 0:
+        return None
+    # (a·x + b) mod p，对所有排列一次性向量化计算
+    permuted = ((hashes[:, None] * _PERM_A + _PERM_B) % _MERSENNE) & _MAX_HASH
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """两个签名的 Jaccard 估计值"""
+    return float(np.count_nonzero(a == b)) / NUM_PERM
+
+
+class DedupIndex:
+    def __init__(self, index_file: str):
+        self.index_file = index_file
+        self.signatures: Dict[str, np.ndarray] = {}
+        self.buckets: Dict[bytes, Set[str]] = {}
+        self.neighbors: Dict[str, Set[str]] = {}   # 已确认的重复关系（无向图）
+        self._log_lines = 0
+        self._follower = JsonlFollower(index_file)
+        self._lock = threading.Lock()
+        with self._locked():
+            pass
+
+    # ---------- 持久化 ----------
+
+    @contextmanager
+    def _locked(self):
+        """线程锁 + 日志文件锁；进入时先追上其他进程追加的记录（不可嵌套）"""
+        with self._lock, store_lock(self.index_file):
+            self._refresh()
+            yield
+
+    def _refresh(self) -> None:
+        reset, entries = self._follower.read_new()
+        if reset:
+            self.signatures.clear()
+            self.buckets.clear()
+            self.neighbors.clear()
+            self._log_lines = 0
+        for entry in entries:
+            self._log_lines += 1
+            if entry.get('deleted'):
+                self._remove(entry['url'])
+            else:
+                sig = np.frombuffer(base64.b64decode(entry['sig']), dtype=np.uint32)
+                if sig.size == NUM_PERM:
+                    self._insert(entry['url'], sig)
+
+    def _append_log(self, entries: List[Dict[str, Any]]) -> None:
+        with open(self.index_file, 'a', encoding='utf-8') as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + '\n')
+        self._log_lines += len(entries)
+        # 删除/覆盖累积过多时压缩日志
+        if self._log_lines > 2 * len(self.signatures) + 1000:
+            self._compact()
+        self._follower.mark_written()
+
+    def _compact(self) -> None:
+        tmp_file = self.index_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            for url, sig in self.signatures.items():
+                f.write(json.dumps(self._entry(url, sig)) + '\n')
+        os.replace(tmp_file, self.index_file)
+        self._log_lines = len(self.signatures)
+
+    @staticmethod
+    def _entry(url: str, sig: np.ndarray) -> Dict[str, Any]:
+        return {'url': url, 'sig': base64.b64encode(sig.tobytes()).decode('ascii')}
+
+    # ---------- 索引维护 ----------
+
+    @staticmethod
+    def _band_keys(sig: np.ndarray) -> List[bytes]:
+        return [bytes([band]) + sig[band * ROWS:(band + 1) * ROWS].tobytes() for band in range(BANDS)]
+
+    def _candidates(self, sig: np.ndarray, exclude: Optional[str] = None) -> Dict[str, float]:
+        found: Set[str] = set()
+        for key in self._band_keys(sig):
+            found |= self.buckets.get(key, set())
+        found.discard(exclude)
+        scores = {url: similarity(sig, self.signatures[url]) for url in found}
+        return {url: score for url, score in scores.items() if score >= THRESHOLD}
+
+    def _insert(self, url: str, sig: np.ndarray) -> None:
+        self._remove(url)
+        for other in self._candidates(sig, exclude=url):
+            self.neighbors.setdefault(url, set()).add(other)
+            self.neighbors.setdefault(other, set()).add(url)
+        self.signatures[url] = sig
+        for key in self._band_keys(sig):
+            self.buckets.setdefault(key, set()).add(url)
+
+    def _remove(self, url: str) -> bool:
+        sig = self.signatures.pop(url, None)
+        if sig is None:
+            return False
+        for key in self._band_keys(sig):
+            bucket = self.buckets.get(key)
+            if bucket is not None:
+                bucket.discard(url)
+                if not bucket:
+                    del self.buckets[key]
+        for other in self.neighbors.pop(url, set()):
+            peers = self.neighbors.get(other)
+            if peers is not None:
+                peers.discard(url)
+                if not peers:
+                    del self.neighbors[other]
+        return True
+
+    def add(self, job: Dict[str, Any]) -> None:
+        """保存岗位后调用：计算签名、入桶并记录到日志"""
+        url = job.get('job_url')
+        sig = minhash(job.get('job_description', ''))
+        if not url or sig is None:
+            return
+        with self._locked():
+            self._insert(url, sig)
+            self._append_log([self._entry(url, sig)])
+
+    def remove(self, urls: List[str]) -> None:
+        with self._locked():
+            removed = [url for url in urls if self._remove(url)]
+            if removed:
+                self._append_log([{'url': url, 'deleted': True} for url in removed])
+
+    def sync(self, jobs: List[Dict[str, Any]]) -> None:
+        """与岗位存储对齐（启动时调用）：补算缺失的签名，清理已删除的岗位"""
+        present = {job.get('job_url') for job in jobs}
+        self.remove([url for url in list(self.signatures) if url not in present])
+        missing = {}
+        for job in jobs:
+            url = job.get('job_url')
+            if not url or url in self.signatures:
+                continue
+            sig = minhash(job.get('job_description', ''))
+            if sig is not None:
+                missing[url] = sig
+        if missing:
+            with self._locked():
+                # 其他 worker 可能已经补算过
+                entries = [self._entry(url, sig) for url, sig in missing.items() if url not in self.signatures]
+                for url, sig in missing.items():
+                    if url not in self.signatures:
+                        self._insert(url, sig)
+                if entries:
+                    self._append_log(entries)
+
+    # ---------- 查询 ----------
+
+    def __contains__(self, url: str) -> bool:
+        with self._locked():
+            return url in self.signatures
+
+    def find_duplicates(self, job: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        查询与给定岗位 JD 近似重复的已入库岗位（不含同 URL 本身），按相似度降序。
+        用于新采集结果入库前的判重。
+        """
+        sig = minhash(job.get('job_description', ''))
+        if sig is None:
+            return []
+        with self._locked():
+            matches = self._candidates(sig, exclude=job.get('job_url'))
+        return [
+            {'job_url': url, 'similarity': round(score, 3)}
+            for url, score in sorted(matches.items(), key=lambda kv: kv[1], reverse=True)
+        ]
+
+    def clusters(self) -> List[List[str]]:
+        """重复关系图的连通分量（只遍历存在重复的岗位），按簇大小降序"""
+        with self._locked():
+            seen: Set[str] = set()
+            result = []
+            for start in self.neighbors:
+                if start in seen:
+                    continue
+                cluster, stack = [], [start]
+                seen.add(start)
+                while stack:
+                    url = stack.pop()
+                    cluster.append(url)
+                    for other in self.neighbors.get(url, ()):
+                        if other not in seen:
+                            seen.add(other)
+                            stack.append(other)
+                result.append(sorted(cluster))
+        result.sort(key=len, reverse=True)
+        return result
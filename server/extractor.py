@@ -0,0 +1,214 @@
+"""
+Extractor - 岗位详情页字段提取
+字段提取策略以声明式 FIELD_SPECS 描述（同一字段可有多个按顺序回退的策略），
+由一段带版本号的 JS 运行时解释执行。运行时通过 context.add_init_script 在每个页面预先注册一次，
+之后一次 page.evaluate 即可完成滚动、等待、字段提取、标题/最终 URL/安全验证判定和可选的 HTML 片段。
+scraper.py 与 debug_scraper.py 共用这里的规格。
+"""
+import json
+from typing import Dict, Any, List
+
+# 修改 FIELD_SPECS 或运行时代码时递增，避免旧页面上残留的旧版本函数被误用
+EXTRACTOR_VERSION = 2
+EXTRACTOR_NAME = f"__jobHunterExtract_v{EXTRACTOR_VERSION}"
+
+# 每个策略:
+#   selector     CSS 选择器
+#   all          遍历全部匹配元素（默认只取第一个）
+#   source       text（默认）/ parent（父元素文本）/ first_text_node（第一个文本节点，去掉粘连的状态文字）
+#   skip_has     元素内含该选择器时跳过（如只有 logo 的链接）
+#   remove       从文本中去掉的前缀/标签文字
+#   list         返回所有匹配元素文本组成的列表
+#   exclude      list 模式下丢弃的文本
+# 按顺序尝试，第一个得到非空结果的策略生效；key 中的 "." 表示嵌套字段
+FIELD_SPECS: Dict[str, List[Dict[str, Any]]] = {
+    "job_title": [{"selector": ".name h1"}],
+    "salary": [{"selector": ".salary"}],
+    "company_name": [
+        # 1. 公司主页链接的 ka 属性（最精确）
+        {"selector": '.sider-company .company-info a[ka="job-detail-company_custompage"]'},
+        # 2. 侧栏中不含 logo 图片的第一个链接
+        {"selector": ".sider-company .company-info a", "all": True, "skip_has": "img"},
+        # 3. 工商信息中的完整注册名称
+        {"selector": ".level-list .company-name", "remove": "公司名称"},
+    ],
+    "company_industry": [{"selector": ".sider-company .icon-industry", "source": "parent"}],
+    "company_size": [{"selector": ".sider-company .icon-scale", "source": "parent"}],
+    "company_financing": [{"selector": ".sider-company .icon-stage", "source": "parent"}],
+
+    "location": [{"selector": ".text-city"}],
+    "work_address": [{"selector": ".location-address"}],
+
+    "experience_required": [{"selector": ".text-experiece"}],
+    "education_required": [{"selector": ".text-degree"}],
+
+    "job_tags": [{"selector": ".job-keyword-list li", "list": True}],
+    "job_description": [{"selector": ".job-sec-text"}],
+    "benefits": [
+        # 完整福利列表（隐藏），没有时退回可见的标签
+        {"selector": ".job-banner .tag-all.job-tags span", "list": True, "exclude": ["..."]},
+        {"selector": ".job-banner .job-tags span", "list": True, "exclude": ["..."]},
+    ],
+
+    "recruiter.name": [{"selector": ".job-boss-info .name", "source": "first_text_node"}],
+    "recruiter.title": [{"selector": ".boss-info-attr"}],
+    "recruiter.status": [{"selector": ".boss-active-time"}],
+}
+
+# 滚动触发懒加载（工作地址、招聘者信息）：(纵向位置, 等待毫秒)，位置为 None 表示滚到底部
+SCROLL_STEPS = [(800, 1000), (None, 2000)]
+
+# 命中即视为触发了安全验证
+SECURITY_TITLE_MARKERS = ["请稍候"]
+SECURITY_URL_MARKERS = ["security-check"]
+
+SNIPPET_LENGTH = 500
+
+_RUNTIME = r"""
+(() => {
+  const NAME = %(name)s;
+  if (window[NAME]) return;
+  const SPECS = %(specs)s;
+  const SECURITY = %(security)s;
+
+  const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+  const textOf = (el, strategy) => {
+    let text = '';
+    if (strategy.source === 'parent') {
+      text = el.parentElement ? el.parentElement.innerText : '';
+    } else if (strategy.source === 'first_text_node') {
+      const node = el.childNodes[0];
+      text = node && node.nodeValue ? node.nodeValue : '';
+    } else {
+      text = el.innerText || '';
+    }
+    if (strategy.remove) text = text.split(strategy.remove).join('');
+    return text.trim();
+  };
+
+  const runStrategy = (strategy) => {
+    const elements = (strategy.all || strategy.list)
+      ? Array.from(document.querySelectorAll(strategy.selector))
+      : [document.querySelector(strategy.selector)].filter(Boolean);
+    const candidates = elements.filter((el) => !(strategy.skip_has && el.querySelector(strategy.skip_has)));
+    if (strategy.list) {
+      const exclude = strategy.exclude || [];
+      return candidates.map((el) => textOf(el, strategy)).filter((t) => t && !exclude.includes(t));
+    }
+    for (const el of candidates) {
+      const text = textOf(el, strategy);
+      if (text) return text;
+    }
+    return '';
+  };
+
+  const extractFields = (trace) => {
+    const fields = {};
+    for (const [key, strategies] of Object.entries(SPECS)) {
+      let value = strategies.some((s) => s.list) ? [] : '';
+      let matched = -1;
+      for (let i = 0; i < strategies.length; i++) {
+        const result = runStrategy(strategies[i]);
+        if (result.length) {
+          value = result;
+          matched = i;
+          break;
+        }
+      }
+      const path = key.split('.');
+      let target = fields;
+      for (const part of path.slice(0, -1)) target = target[part] = target[part] || {};
+      target[path[path.length - 1]] = value;
+      trace[key] = matched;
+    }
+    return fields;
+  };
+
+  window[NAME] = async (opts = {}) => {
+    for (const [y, wait] of opts.scroll || []) {
+      try {
+        if (document.body) window.scrollTo(0, y === null ? document.body.scrollHeight : y);
+      } catch (e) {}
+      await sleep(wait);
+    }
+    const trace = {};
+    let fields = null;
+    let error = null;
+    try {
+      fields = extractFields(trace);
+    } catch (e) {
+      error = String(e);
+    }
+    const title = document.title;
+    const url = location.href;
+    return {
+      fields,
+      error,
+      title,
+      url,
+      blocked: SECURITY.title.some((m) => title.includes(m)) || SECURITY.url.some((m) => url.includes(m)),
+      snippet: opts.snippet && document.documentElement ? document.documentElement.outerHTML.slice(0, opts.snippet) : null,
+      trace: opts.trace ? trace : null,
+      version: %(version)d,
+    };
+  };
+})();
+"""
+
+EXTRACTOR_SCRIPT = _RUNTIME % {
+    "name": json.dumps(EXTRACTOR_NAME),
+    "specs": json.dumps(FIELD_SPECS, ensure_ascii=False),
+    "security": json.dumps({"title": SECURITY_TITLE_MARKERS, "url": SECURITY_URL_MARKERS}, ensure_ascii=False),
+    "version": EXTRACTOR_VERSION,
+}
+
+_CALL = f"opts => window.{EXTRACTOR_NAME} ? window.{EXTRACTOR_NAME}(opts) : null"
+
+
+async def install(context) -> None:
+    """在 browser context 上注册提取运行时，之后打开的每个页面都会预先定义好提取函数"""
+    await context.add_init_script(script=EXTRACTOR_SCRIPT)
+
+
+def is_blocked(title: str, url: str) -> bool:
+    """与 JS 运行时相同的安全验证判定"""
+    return any(m in title for m in SECURITY_TITLE_MARKERS) or any(m in url for m in SECURITY_URL_MARKERS)
+
+
+async def extract(page, scroll: bool = True, snippet: bool = False, trace: bool = False) -> Dict[str, Any]:
+    """
+    一次往返完成滚动、等待与提取，返回 {fields, error, title, url, blocked, snippet, trace, version}。
+    页面若不是在 install 之后创建的（找不到提取函数），先就地注入运行时再调用。
+    """
+    opts = {
+        "scroll": SCROLL_STEPS if scroll else [],
+        "snippet": SNIPPET_LENGTH if snippet else 0,
+        "trace": trace,
+    }
+    try:
+        result = await page.evaluate(_CALL, opts)
+        if result is None:
+            await page.evaluate(EXTRACTOR_SCRIPT)
+            result = await page.evaluate(_CALL, opts)
+        return result
+    except Exception as e:
+        # 滚动等待期间页面跳转（典型的是安全验证重定向）会销毁执行上下文，
+        # 此时按跳转后的页面再做一次安全验证判定，命中则返回 blocked 而不是笼统的报错
+        try:
+            await page.wait_for_load_state('domcontentloaded', timeout=10000)
+            title, url = await page.title(), page.url
+        except Exception:
+            raise e
+        if not is_blocked(title, url):
+            raise
+        return {
+            "fields": None,
+            "error": str(e),
+            "title": title,
+            "url": url,
+            "blocked": True,
+            "snippet": None,
+            "trace": None,
+            "version": EXTRACTOR_VERSION,
+        }
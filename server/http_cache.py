@@ -0,0 +1,122 @@
+"""
+HTTP Cache - 列表接口的条件请求与压缩缓存
+按版本生成强 ETag：客户端带 If-None-Match 命中时直接返回 304，不读取也不序列化数据；
+未命中时序列化一次，并按版本缓存原始/gzip/brotli 响应体，同一版本的重复请求直接复用。
+不同编码的响应体字节不同，强 ETag 带上编码后缀（"<版本>-gzip"），比较 If-None-Match 时去掉后缀并按弱比较处理。
+"""
+import gzip
+import json
+import threading
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Callable, Any, Optional, Dict, Iterable, Tuple
+
+from fastapi import Request, Response
+
+try:
+    import brotli
+except ImportError:  # brotli 可选，未安装时只提供 gzip
+    brotli = None
+
+MIN_COMPRESS_SIZE = 1024  # 小于该大小的响应不压缩
+ENCODINGS: Tuple[str, ...] = ('gzip', 'br')
+
+
+def _etag(version: str, encoding: str) -> str:
+    return f'"{version}"' if encoding == 'identity' else f'"{version}-{encoding}"'
+
+
+class _CachedBody:
+    def __init__(self, version: str, raw: bytes):
+        self.version = version
+        self.encoded: Dict[str, bytes] = {'identity': raw}
+
+    def get(self, encoding: str) -> bytes:
+        body = self.encoded.get(encoding)
+        if body is None:
+            raw = self.encoded['identity']
+            if encoding == 'br':
+                body = brotli.compress(raw, quality=5)
+            else:
+                body = gzip.compress(raw, compresslevel=6)
+            self.encoded[encoding] = body
+        return body
+
+
+class ResponseCache:
+    """每个 key（接口 + 查询参数）只保留最新版本的响应体"""
+
+    def __init__(self):
+        self._entries: Dict[str, _CachedBody] = {}
+        self._lock = threading.Lock()
+
+    def respond(
+        self,
+        request: Request,
+        key: str,
+        version_parts: Iterable[Any],
+        produce: Callable[[], Any],
+        last_modified=None,
+        extra_headers: Optional[Dict[str, str]] = None,
+    ) -> Response:
+        version = '-'.join(str(p) for p in version_parts)
+        accept_encoding = request.headers.get('accept-encoding', '')
+        headers = {"Cache-Control": "no-cache", "Vary": "Accept-Encoding", **(extra_headers or {})}
+        if last_modified is not None:
+            headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry.version != version:
+            entry = None
+
+        if _not_modified(request, version, last_modified):
+            # 304 带上客户端这次会拿到的编码对应的 ETag（不知道响应体大小时按可压缩处理）
+            size = len(entry.encoded['identity']) if entry is not None else MIN_COMPRESS_SIZE
+            headers["ETag"] = _etag(version, _pick_encoding(accept_encoding, size))
+            return Response(status_code=304, headers=headers)
+
+        if entry is None:
+            raw = json.dumps(produce(), ensure_ascii=False).encode('utf-8')
+            entry = _CachedBody(version, raw)
+            with self._lock:
+                self._entries[key] = entry
+
+        encoding = _pick_encoding(accept_encoding, len(entry.encoded['identity']))
+        headers["ETag"] = _etag(version, encoding)
+        if encoding != 'identity':
+            headers["Content-Encoding"] = encoding
+        return Response(content=entry.get(encoding), media_type="application/json", headers=headers)
+
+
+def _not_modified(request: Request, version: str, last_modified) -> bool:
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        # If-None-Match 存在时忽略 If-Modified-Since (RFC 9110 13.2.2)；
+        # 按弱比较（忽略 W/ 前缀），任一编码的 ETag 都表示客户端持有当前版本
+        current = {version} | {f"{version}-{encoding}" for encoding in ENCODINGS}
+        for tag in (t.strip() for t in if_none_match.split(',')):
+            if tag == '*':
+                return True
+            if tag.startswith('W/'):
+                tag = tag[2:]
+            if len(tag) >= 2 and tag[0] == tag[-1] == '"' and tag[1:-1] in current:
+                return True
+        return False
+    if_modified_since = request.headers.get('if-modified-since')
+    if if_modified_since and last_modified is not None:
+        try:
+            return last_modified.replace(microsecond=0) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _pick_encoding(accept_encoding: str, size: int) -> str:
+    if size < MIN_COMPRESS_SIZE:
+        return 'identity'
+    accepted = {part.split(';')[0].strip().lower() for part in accept_encoding.split(',')}
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return 'identity'
@@ -1,9 +1,9 @@
 import os
 import uvicorn
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, UploadFile, File, Request
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 import asyncio
 
 # Initialize App
@@ -16,12 +16,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Last-Modified", "X-Change-Seq", "X-Score-Epoch", "X-Score-Seq"],
 )
 
 # Constants
 DATA_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), "../job_details.json"))
 
 from task_manager import TaskManager
+from match_engine import match_engine
+from http_cache import ResponseCache
+from store_lock import atomic_write_json
+from columnar_export import export_jobs, FORMATS as COLUMNAR_FORMATS
+from migrations import STORES as MIGRATION_STORES, migrate
 from fastapi.responses import FileResponse, StreamingResponse
 import pandas as pd
 import io
@@ -34,33 +40,135 @@ def read_root():
 # We use the absolute path to job_details.json
 task_manager = TaskManager(DATA_FILE)
 
+# Serialized + compressed bodies of the polled list endpoints, keyed by store version
+response_cache = ResponseCache()
+
+def current_scores():
+    """Match scores for the active resume, after catching up with job changes made by any worker."""
+    match_engine.follow(task_manager.job_changes, task_manager.get_all_jobs)
+    return match_engine.score()
+
+def score_epoch() -> str:
+    """Scores are only comparable under the same resume; delta clients refetch the full list when it changes."""
+    return match_engine.active_resume or ""
+
+def score_seq_header(job_seq: int) -> str:
+    return str(job_seq) if match_engine.ready else ""
+
+def attach_scores(feed: dict, score_seq: Optional[int], job_seq: int, urls: Optional[set] = None) -> dict:
+    """
+    Scores use corpus-wide IDF, so any job upsert/delete shifts the score of every row, not just
+    the changed ones. When the job store moved past the client's score_seq, the feed carries a
+    compact {job_url: score} map (restricted to `urls` if given) so the client can patch every row.
+    While the index is still warming the scores are partial, so score_seq stays null and clients
+    keep receiving the map until warm-up finishes. Returns the current scores for the changed records.
+    """
+    ready = match_engine.ready
+    scores = current_scores()
+    feed['score_epoch'] = score_epoch()
+    feed['score_seq'] = job_seq if ready else None
+    feed['scores'] = None
+    if scores and (score_seq != job_seq or not ready):
+        feed['scores'] = scores if urls is None else {url: scores.get(url) for url in urls}
+    return scores
+
 @app.on_event("startup")
 async def startup_event():
     # Ensure data file exists or can be created
     if not os.path.exists(DATA_FILE):
-        with open(DATA_FILE, 'w', encoding='utf-8') as f:
-            f.write('[]')
+        atomic_write_json(DATA_FILE, [])
+    # Bring stores written by an older version up to the current schema before indexing them
+    # (a no-op once migrated; an interrupted migration resumes from its checkpoint)
+    for name in MIGRATION_STORES:
+        result = await asyncio.to_thread(migrate, name)
+        if result['from'] != result['to']:
+            print(f"Migrated {name} store: schema v{result['from']} -> v{result['to']}, {result['changed']} records updated")
+    # Build the match index in the background; tokenizing a large store takes a while
+    asyncio.create_task(asyncio.to_thread(match_engine.initial_sync, task_manager.job_changes, task_manager.get_all_jobs))
+    # Load the store inside the worker thread too: json.load of a large store would block the event loop
+    asyncio.create_task(asyncio.to_thread(lambda: task_manager.dedup_index.sync(task_manager.get_all_jobs())))
+    # Tasks queued before a restart (the queue is persisted in the shared state file)
+    await task_manager.resume_pending()
 
 # Request Models
 class TaskSubmit(BaseModel):
     urls: List[str]
+    dedup_mode: str = "flag"  # off / flag / skip
 
 @app.post("/api/tasks/submit")
 async def submit_tasks(task_data: TaskSubmit):
-    count = task_manager.add_tasks(task_data.urls)
+    if task_data.dedup_mode not in ("off", "flag", "skip"):
+        raise HTTPException(status_code=400, detail="dedup_mode must be 'off', 'flag' or 'skip'.")
+    count = await task_manager.add_tasks(task_data.urls, task_data.dedup_mode)
     return {
         "message": f"Successfully added {count} tasks to queue", 
-        "total_queued": task_manager.queue.qsize(),
+        "total_queued": await asyncio.to_thread(task_manager.queue_length),
         "status": "queued"
     }
 
 @app.get("/api/tasks/status")
-def get_status():
-    return task_manager.get_status_summary()
+def get_status(request: Request):
+    version = task_manager.status_version
+    return response_cache.respond(
+        request, "status", ["status", version.tag],
+        task_manager.get_status_summary,
+        last_modified=version.modified_at,
+    )
+
+def list_jobs(sort: Optional[str] = None):
+    jobs = task_manager.get_all_jobs()
+    scores = current_scores()
+    if scores:
+        for job in jobs:
+            job['match_score'] = scores.get(job.get('job_url'))
+        if sort == "match_score":
+            jobs.sort(key=lambda j: j.get('match_score') or 0, reverse=True)
+    return jobs
 
 @app.get("/api/jobs")
-def get_jobs():
-    return task_manager.get_all_jobs()
+def get_jobs(request: Request, sort: Optional[str] = None):
+    version = task_manager.jobs_version
+    # Read the change seq before the snapshot: replaying a few extra deltas is harmless, missing one is not
+    change_seq = task_manager.job_changes.current_seq()
+    # Scores depend on the active resume and on whether the match index has finished building
+    return response_cache.respond(
+        request, f"jobs:{sort}",
+        ["jobs", version.tag, match_engine.active_resume or "_", "ready" if match_engine.ready else "warming", sort or "_"],
+        lambda: list_jobs(sort),
+        last_modified=version.modified_at,
+        extra_headers={"X-Change-Seq": str(change_seq), "X-Score-Epoch": score_epoch(), "X-Score-Seq": score_seq_header(change_seq)},
+    )
+
+@app.get("/api/jobs/changes")
+def get_job_changes(since: int = 0, score_seq: Optional[int] = None):
+    """
+    增量同步：返回 since 之后新增/更新/删除的岗位；resync=True 时客户端需重新拉取全量列表。
+    score_seq 为客户端分数对应的岗位变更序号，落后时附带全部岗位的最新分数 scores。
+    """
+    feed = task_manager.job_changes.since(since)
+    scores = attach_scores(feed, score_seq, feed['seq'])
+    if scores:
+        feed['changes'] = [
+            {**c, 'record': {**c['record'], 'match_score': scores.get(c['key'])}} if c['op'] == 'upsert' else c
+            for c in feed['changes']
+        ]
+    return feed
+
+@app.get("/api/jobs/duplicates")
+def get_duplicate_clusters():
+    """近似重复 JD 的聚类结果（每簇为同一岗位的多个 URL）"""
+    jobs_by_url = {job.get('job_url'): job for job in task_manager.get_all_jobs()}
+    clusters = []
+    for urls in task_manager.dedup_index.clusters():
+        clusters.append([
+            {
+                "job_url": url,
+                "job_title": jobs_by_url.get(url, {}).get('job_title', ''),
+                "company_name": jobs_by_url.get(url, {}).get('company_name', ''),
+            }
+            for url in urls
+        ])
+    return {"cluster_count": len(clusters), "clusters": clusters}
 
 @app.get("/api/tasks/debug")
 def get_debug_tasks():
@@ -72,6 +180,12 @@ class DeleteRequest(BaseModel):
 
 @app.get("/api/export")
 def export_data(format: str = "json"):
+    if format in COLUMNAR_FORMATS:
+        # Cached per store version; only regenerated after the job store changes
+        path = export_jobs(task_manager.data_file, task_manager.jobs_version.tag, format)
+        ext, media_type = COLUMNAR_FORMATS[format]
+        return FileResponse(path, media_type=media_type, filename=f"job_details.{ext}")
+
     data = task_manager.get_all_jobs()
     
     if format == "json":
@@ -89,10 +203,38 @@ def export_data(format: str = "json"):
         return response
     
     else:
-        raise HTTPException(status_code=400, detail="Unsupported format. Use 'json' or 'csv'.")
+        raise HTTPException(status_code=400, detail="Unsupported format. Use 'json', 'csv', 'parquet' or 'arrow'.")
+
+# ==================== Match API ====================
+
+@app.post("/api/match/resume")
+async def upload_resume(file: UploadFile = File(...)):
+    """上传简历（纯文本/Markdown），设为当前用于匹配打分的简历"""
+    raw = await file.read()
+    try:
+        text = raw.decode('utf-8')
+    except UnicodeDecodeError:
+        text = raw.decode('gbk', errors='ignore')
+    if not text.strip():
+        raise HTTPException(status_code=400, detail="Resume is empty or not a text file")
+
+    # Tokenizing the resume (jieba) and warming the score cache are CPU-bound: keep them off the event loop
+    await asyncio.to_thread(match_engine.set_resume, text)
+    scores = await asyncio.to_thread(current_scores)
+    return {"success": True, "scored_jobs": len(scores), **match_engine.resume_info()}
+
+@app.get("/api/match/resume")
+def get_resume_info():
+    """当前简历信息（未上传时为 null）"""
+    return {"resume": match_engine.resume_info()}
+
+@app.delete("/api/match/resume")
+def clear_resume():
+    match_engine.clear_resume()
+    return {"success": True}
 
 @app.post("/api/jobs/delete")
-async def delete_jobs(request: DeleteRequest):
+def delete_jobs(request: DeleteRequest):
     count = task_manager.delete_jobs(request.urls)
     return {"deleted_count": count, "message": f"Successfully deleted {count} jobs"}
 
@@ -103,9 +245,13 @@ class RetryRequest(BaseModel):
 def get_failed_tasks():
     return task_manager.get_failed_tasks()
 
+@app.get("/api/tasks/skipped")
+def get_skipped_tasks():
+    return task_manager.get_skipped_tasks()
+
 @app.post("/api/tasks/retry")
-def retry_tasks(request: RetryRequest):
-    count = task_manager.retry_tasks(request.urls)
+async def retry_tasks(request: RetryRequest):
+    count = await task_manager.retry_tasks(request.urls)
     return {
         "retry_count": count, 
         "message": f"Successfully re-queued {count} failed tasks",
@@ -120,7 +266,9 @@ from track_manager import (
     delete_from_track, 
     undo_delete,
     TrackStatus,
-    Priority
+    Priority,
+    track_version,
+    track_changes
 )
 
 class TrackAddRequest(BaseModel):
@@ -139,10 +287,46 @@ class TrackUpdateRequest(BaseModel):
 class TrackDeleteRequest(BaseModel):
     job_id: str
 
+def list_tracked_jobs(sort: Optional[str] = None):
+    jobs = get_all_tracked_jobs()
+    scores = current_scores()
+    if scores:
+        for job in jobs:
+            job.setdefault('analysis_tags', {})['match_score'] = scores.get(job.get('job_url'))
+        if sort == "match_score":
+            jobs.sort(key=lambda j: j['analysis_tags'].get('match_score') or 0, reverse=True)
+    return jobs
+
 @app.get("/api/track/list")
-def list_tracked_jobs():
-    """获取所有追踪的岗位"""
-    return get_all_tracked_jobs()
+def get_tracked_jobs(request: Request, sort: Optional[str] = None):
+    """获取所有追踪的岗位（支持 ETag 条件请求）"""
+    change_seq = track_changes.current_seq()
+    job_seq = task_manager.job_changes.current_seq()
+    # Match scores come from the job store, so job changes (from any worker) must invalidate this body too
+    return response_cache.respond(
+        request, f"track:{sort}",
+        ["track", track_version.tag, task_manager.jobs_version.tag, match_engine.active_resume or "_",
+         "ready" if match_engine.ready else "warming", sort or "_"],
+        lambda: list_tracked_jobs(sort),
+        last_modified=track_version.modified_at,
+        extra_headers={"X-Change-Seq": str(change_seq), "X-Score-Epoch": score_epoch(), "X-Score-Seq": score_seq_header(job_seq)},
+    )
+
+@app.get("/api/track/changes")
+def get_track_changes(since: int = 0, score_seq: Optional[int] = None):
+    """追踪列表增量同步（含删除与撤销删除）；score_seq 同 /api/jobs/changes，分数只包含追踪中的岗位"""
+    feed = track_changes.since(since)
+    tracked_urls = {job.get('job_url') for job in get_all_tracked_jobs()}
+    scores = attach_scores(feed, score_seq, task_manager.job_changes.current_seq(), tracked_urls)
+    if scores:
+        feed['changes'] = [
+            {**c, 'record': {
+                **c['record'],
+                'analysis_tags': {**(c['record'].get('analysis_tags') or {}), 'match_score': scores.get(c['record'].get('job_url'))},
+            }} if c['op'] == 'upsert' else c
+            for c in feed['changes']
+        ]
+    return feed
 
 @app.post("/api/track/add")
 def add_tracked_job(request: TrackAddRequest):
@@ -202,5 +386,8 @@ def get_track_statuses():
     }
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    # WORKERS=N runs N API processes; stores are file-locked and the task queue is shared,
+    # so any worker can serve any request (reload is only available with a single worker)
+    workers = int(os.environ.get("WORKERS", "1"))
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=workers == 1, workers=workers)
 
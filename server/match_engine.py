@@ -0,0 +1,362 @@
+"""
+Match Engine - 简历与岗位 JD 匹配度评分模块
+在本地维护 job_description + job_tags 的 TF-IDF 稀疏矩阵，一次向量化计算即可为全部岗位打分，
+新采集的岗位增量追加到矩阵中，无需重新拟合整个语料。
+多 worker 时每个进程各自维护索引，通过岗位变更日志追上其他进程的写入；当前简历保存在文件中共享。
+"""
+import hashlib
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Optional, List, Dict, Any
+
+import numpy as np
+from scipy import sparse
+
+try:
+    import jieba
+    jieba.setLogLevel(60)
+except ImportError:  # 未安装 jieba 时退化为中文二元组分词
+    jieba = None
+
+# 当前简历（纯文本），所有 worker 共享
+RESUME_FILE = os.path.join(os.path.dirname(__file__), '..', 'match_resume.txt')
+
+_TOKEN_RE = re.compile(r'[a-z][a-z0-9+#.\-]*|[0-9]+|[一-鿿]+')
+_CJK_RE = re.compile(r'[一-鿿]+')
+
+# 常见但没有区分度的 JD 用词
+STOP_WORDS = {
+    '的', '和', '与', '及', '或', '等', '有', '在', '对', '能', '并', '了', '是', '为', '以上', '相关',
+    '负责', '具备', '具有', '能力', '优先', '熟悉', '了解', '掌握', '良好', '工作', '经验', '要求',
+    '岗位', '职责', '任职', '以及', '进行', '公司', '团队', 'and', 'or', 'the', 'of', 'to', 'in', 'a',
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """中英文混合分词，返回去停用词后的 token 列表"""
+    if not text:
+        return []
+    text = text.lower()
+    tokens = []
+    for chunk in _TOKEN_RE.findall(text):
+        if _CJK_RE.fullmatch(chunk):
+            if jieba is not None:
+                tokens.extend(w for w in jieba.lcut_for_search(chunk) if len(w) > 1)
+            else:
+                tokens.extend(chunk[i:i + 2] for i in range(len(chunk) - 1))
+        elif len(chunk) > 1:
+            tokens.append(chunk.strip('.-'))
+    return [t for t in tokens if t and t not in STOP_WORDS]
+
+
+def job_tokens(job: Dict[str, Any]) -> List[str]:
+    """岗位文档 = JD 正文 + 岗位标签（标签整体也作为一个 token）"""
+    tokens = tokenize(job.get('job_description') or '')
+    for tag in job.get('job_tags') or []:
+        tokens.extend(tokenize(tag))
+        tag = tag.strip().lower()
+        if tag:
+            tokens.append(tag)
+    return tokens
+
+
+def resume_hash(text: str) -> str:
+    """简历内容的稳定标识，用作分数缓存的 key"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+
+# 尾块超过主矩阵这一比例时才并入主矩阵，使每次追加的拷贝量摊还为常数
+MERGE_FRACTION = 0.1
+MERGE_MIN_ROWS = 1024
+# 已删除（含被重新采集替换）的行超过这一比例时压缩矩阵
+COMPACT_FRACTION = 0.25
+COMPACT_MIN_ROWS = 256
+
+
+class MatchEngine:
+    """
+    行 = 岗位（以 job_url 标识），列 = 词表。
+    矩阵中只保存次线性词频 1 + log(tf)，IDF 在打分时按当前文档频率计算，
+    因此追加/删除岗位只需更新 df 向量，不需要重算已有的行。
+    行分为主矩阵 _base 和较小的尾块 _tail：新行只追加到尾块，尾块足够大时才整体并入主矩阵；
+    删除只做标记，死行比例过高时统一压缩。
+    """
+
+    def __init__(self):
+        self.vocab: Dict[str, int] = {}
+        self.df = np.zeros(0, dtype=np.int64)
+        self.row_of: Dict[str, int] = {}    # job_url -> 行号
+        self.urls: List[Optional[str]] = []  # 行号 -> job_url（已删除为 None）
+        empty = sparse.csr_matrix((0, 0), dtype=np.float64)
+        self._base = self._base_sq = empty    # 主矩阵及其逐元素平方（用于文档范数）
+        self._tail = self._tail_sq = empty    # 最近追加的行
+        self._pending: List[Dict[int, float]] = []
+        self._alive = bytearray()  # 行号 -> 1/0，追加是 O(1)
+        self._dead = 0
+        self.version = 0
+        self._lock = threading.RLock()  # 接口线程池与采集协程会并发访问
+        self.synced_seq: Optional[int] = None  # 已应用到的岗位变更序号，None 表示首次同步未完成
+
+        self.resumes: Dict[str, Dict[str, int]] = {}  # resume hash -> 词频
+        self._active_resume: Optional[str] = None
+        self._resume_stat = None
+        self._score_cache: Dict[str, Any] = {}  # resume hash -> (version, {job_url: score})
+
+    # ---------- 索引维护 ----------
+
+    def _term_ids(self, tokens: List[str], grow: bool) -> Counter:
+        counts = Counter()
+        for tok in tokens:
+            idx = self.vocab.get(tok)
+            if idx is None:
+                if not grow:
+                    continue
+                idx = self.vocab[tok] = len(self.vocab)
+            counts[idx] += 1
+        return counts
+
+    def add_job(self, job: Dict[str, Any]) -> None:
+        """新增或替换一个岗位（同 job_url 的旧行会被标记删除）"""
+        url = job.get('job_url')
+        if not url:
+            return
+        tokens = job_tokens(job)  # 分词较慢，放在锁外
+        with self._lock:
+            self._add_job(url, tokens)
+
+    def _add_job(self, url: str, tokens: List[str]) -> None:
+        self._drop_row(url)
+
+        counts = self._term_ids(tokens, grow=True)
+        if len(self.vocab) > len(self.df):
+            # 按倍数扩容，避免词表每增长一次就拷贝整个 df 向量
+            grown = np.zeros(max(len(self.vocab), 2 * len(self.df)), dtype=np.int64)
+            grown[:len(self.df)] = self.df
+            self.df = grown
+        if counts:
+            self.df[list(counts.keys())] += 1
+
+        self.row_of[url] = len(self.urls)
+        self.urls.append(url)
+        self._alive.append(1)
+        self._pending.append({idx: 1.0 + math.log(tf) for idx, tf in counts.items()})
+        self.version += 1
+
+    def remove_jobs(self, urls: List[str]) -> None:
+        with self._lock:
+            changed = False
+            for url in urls:
+                changed = self._drop_row(url) or changed
+            if changed:
+                self.version += 1
+
+    def _drop_row(self, url: str) -> bool:
+        row = self.row_of.pop(url, None)
+        if row is None:
+            return False
+        base_rows, tail_rows = self._base.shape[0], self._tail.shape[0]
+        if row < base_rows:
+            terms = self._base.indices[self._base.indptr[row]:self._base.indptr[row + 1]]
+        elif row < base_rows + tail_rows:
+            r = row - base_rows
+            terms = self._tail.indices[self._tail.indptr[r]:self._tail.indptr[r + 1]]
+        else:
+            r = row - base_rows - tail_rows
+            terms = list(self._pending[r].keys())
+            self._pending[r] = {}
+        self.df[terms] -= 1
+        self.urls[row] = None
+        self._alive[row] = 0
+        self._dead += 1
+        return True
+
+    def sync(self, jobs: List[Dict[str, Any]]) -> None:
+        """与岗位存储对齐：补齐缺失的岗位、移除已不存在的岗位（启动时调用）"""
+        present = {job.get('job_url') for job in jobs}
+        self.remove_jobs([url for url in list(self.row_of) if url not in present])
+        for job in jobs:
+            if job.get('job_url') not in self.row_of:
+                self.add_job(job)
+        with self._lock:
+            self._flush()
+
+    @property
+    def ready(self) -> bool:
+        return self.synced_seq is not None
+
+    def initial_sync(self, changes, load_jobs) -> None:
+        """启动时全量建索引，并记下对应的变更序号（先取序号，重放少量重复变更是幂等的）"""
+        seq = changes.current_seq()
+        self.sync(load_jobs())
+        self.synced_seq = seq
+
+    def follow(self, changes, load_jobs) -> None:
+        """应用自上次以来岗位存储的变更（可能来自其他 worker）；日志已压缩时退回全量同步"""
+        with self._lock:
+            if self.synced_seq is None:
+                return
+            feed = changes.since(self.synced_seq)
+            if feed['resync']:
+                self.sync(load_jobs())
+            else:
+                for change in feed['changes']:
+                    if change['op'] == 'delete':
+                        self.remove_jobs([change['key']])
+                    else:
+                        self.add_job(change['record'])
+            self.synced_seq = feed['seq']
+
+    @staticmethod
+    def _squared(matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+        squared = matrix.copy()
+        squared.data **= 2
+        return squared
+
+    def _flush(self) -> None:
+        """把待追加的行并入尾块（只拷贝尾块），尾块足够大时并入主矩阵，必要时压缩死行"""
+        n_cols = len(self.vocab)
+        for matrix in (self._base, self._base_sq, self._tail, self._tail_sq):
+            if matrix.shape[1] != n_cols:
+                matrix.resize((matrix.shape[0], n_cols))  # 只增加列，不拷贝数据
+        if self._pending:
+            indptr = [0]
+            indices: List[int] = []
+            data: List[float] = []
+            for row in self._pending:
+                indices.extend(row.keys())
+                data.extend(row.values())
+                indptr.append(len(indices))
+            block = sparse.csr_matrix(
+                (np.array(data, dtype=np.float64), np.array(indices, dtype=np.int64), np.array(indptr, dtype=np.int64)),
+                shape=(len(self._pending), n_cols),
+            )
+            self._pending = []
+            self._tail = sparse.vstack([self._tail, block], format='csr')
+            self._tail_sq = sparse.vstack([self._tail_sq, self._squared(block)], format='csr')
+
+        if self._tail.shape[0] > max(MERGE_MIN_ROWS, MERGE_FRACTION * self._base.shape[0]):
+            self._merge_tail()
+        if self._dead >= COMPACT_MIN_ROWS and self._dead > COMPACT_FRACTION * len(self.urls):
+            self._compact()
+
+    def _merge_tail(self) -> None:
+        n_cols = len(self.vocab)
+        self._base = sparse.vstack([self._base, self._tail], format='csr')
+        self._base_sq = sparse.vstack([self._base_sq, self._tail_sq], format='csr')
+        self._tail = self._tail_sq = sparse.csr_matrix((0, n_cols), dtype=np.float64)
+
+    def _compact(self) -> None:
+        """丢弃已删除的行并重新编号（调用方已 flush，pending 为空）"""
+        self._merge_tail()
+        keep = np.flatnonzero(np.frombuffer(bytes(self._alive), dtype=np.uint8))
+        self._base = self._base[keep]
+        self._base_sq = self._base_sq[keep]
+        self.urls = [self.urls[r] for r in keep]
+        self.row_of = {url: row for row, url in enumerate(self.urls)}
+        self._alive = bytearray(b'\x01' * len(self.urls))
+        self._dead = 0
+
+    @property
+    def row_count(self) -> int:
+        """矩阵中的行数（含尚未压缩的死行）"""
+        return len(self.urls)
+
+    # ---------- 简历与打分 ----------
+
+    def set_resume(self, text: str) -> str:
+        """登记简历并设为当前简历（写入共享文件），返回简历 hash"""
+        key = resume_hash(text)
+        tmp_file = RESUME_FILE + f'.{os.getpid()}.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_file, RESUME_FILE)
+        with self._lock:
+            if key not in self.resumes:
+                self.resumes[key] = Counter(tokenize(text))
+        return key
+
+    def clear_resume(self) -> None:
+        try:
+            os.remove(RESUME_FILE)
+        except FileNotFoundError:
+            pass
+
+    @property
+    def active_resume(self) -> Optional[str]:
+        """当前简历 hash；简历文件被其他 worker 更新时重新加载"""
+        try:
+            st = os.stat(RESUME_FILE)
+            stat = (st.st_ino, st.st_mtime_ns, st.st_size)
+        except OSError:
+            stat = None
+        with self._lock:
+            if stat != self._resume_stat:
+                self._resume_stat = stat
+                self._active_resume = None
+                if stat is not None:
+                    with open(RESUME_FILE, 'r', encoding='utf-8') as f:
+                        text = f.read()
+                    key = resume_hash(text)
+                    if key not in self.resumes:
+                        self.resumes[key] = Counter(tokenize(text))
+                    self._active_resume = key
+            return self._active_resume
+
+    def score(self, key: Optional[str] = None) -> Dict[str, float]:
+        """
+        一次稀疏矩阵-向量乘法为所有岗位计算余弦相似度，返回 {job_url: 0~100 分}。
+        结果按 (简历 hash, 索引版本) 缓存。
+        """
+        with self._lock:
+            return self._score(key or self.active_resume)
+
+    def _score(self, key: Optional[str]) -> Dict[str, float]:
+        if key is None or key not in self.resumes:
+            return {}
+        cached = self._score_cache.get(key)
+        if cached and cached[0] == self.version:
+            return cached[1]
+
+        self._flush()
+        alive = np.frombuffer(bytes(self._alive), dtype=np.uint8).astype(bool)
+        n_docs = int(alive.sum())
+        if n_docs == 0:
+            return {}
+        idf = np.log((1.0 + n_docs) / (1.0 + self.df[:len(self.vocab)])) + 1.0
+
+        counts = self._term_ids(list(self.resumes[key].elements()), grow=False)
+        query = np.zeros(len(self.vocab))
+        for idx, tf in counts.items():
+            query[idx] = 1.0 + math.log(tf)
+        query *= idf
+        query_norm = np.linalg.norm(query)
+
+        # ||diag(idf) · d|| = sqrt(d² · idf²)，不需要物化加权矩阵
+        idf_sq = idf * idf
+        doc_norms = np.sqrt(np.concatenate([self._base_sq @ idf_sq, self._tail_sq @ idf_sq]))
+        weighted = query * idf
+        dots = np.concatenate([self._base @ weighted, self._tail @ weighted])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sims = np.where(doc_norms > 0, dots / (doc_norms * (query_norm or 1.0)), 0.0)
+
+        rows = np.flatnonzero(alive)
+        scores = {self.urls[r]: round(float(sims[r]) * 100, 1) for r in rows}
+        self._score_cache[key] = (self.version, scores)
+        return scores
+
+    def resume_info(self) -> Optional[Dict[str, Any]]:
+        key = self.active_resume
+        if key is None:
+            return None
+        return {
+            'resume_hash': key,
+            'token_count': sum(self.resumes[key].values()),
+            'indexed_jobs': len(self.row_of),
+        }
+
+
+# Singleton
+match_engine = MatchEngine()
@@ -0,0 +1,235 @@
+"""
+Migrations - JSON 存储的版本化 schema 迁移
+每个存储的 schema 版本记录在 <文件>.schema 中，版本号即已应用的迁移步骤数。
+迁移以流式方式逐条读取 JSON 数组、依次经过各步骤后写入临时文件，内存占用与单条记录大小相关；
+每处理 CHECKPOINT_EVERY 条记录写一次检查点，中断后重新运行会从检查点继续，完成后原子替换原文件。
+整个过程持有该存储的 store_lock，运行中的服务写入会等待迁移结束。
+
+迁移步骤必须是幂等的：替换文件后、写入 schema 版本前崩溃时，重新运行会再执行一遍。
+
+用法:
+    python migrations.py              # 迁移全部存储
+    python migrations.py jobs         # 只迁移岗位存储
+    python migrations.py --status     # 查看各存储的 schema 版本
+"""
+import argparse
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from change_log import ChangeLog
+from store_lock import store_lock, atomic_write_json, iter_records
+from store_version import StoreVersion
+from track_manager import TRACKED_JOBS_FILE, track_changes, track_version, extract_job_id
+
+DATA_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), "../job_details.json"))
+
+CHUNK_SIZE = 1 << 20
+CHECKPOINT_EVERY = 2000
+
+
+# ---------- 迁移步骤 ----------
+# 每个步骤接收一条记录，原地修改或返回新记录；返回 None 表示丢弃该记录
+
+def backfill_scraped_at(job: Dict[str, Any]) -> Dict[str, Any]:
+    """早期数据没有采集时间，用迁移时间补齐"""
+    if 'scraped_at' not in job:
+        job['scraped_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    return job
+
+
+def canonicalize_job_id(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    job_id 统一由 job_url 推导（旧版追踪记录里用内置 hash() 生成的 ID 在进程间不稳定）。
+    job_url 本身保持不变：去重索引、匹配索引和前端都以它为键，改写会让运行中的服务失去对应关系。
+    """
+    url = job.get('job_url')
+    if url:
+        job['job_id'] = extract_job_id(url)
+    return job
+
+
+def drop_debug_info(job: Dict[str, Any]) -> Dict[str, Any]:
+    """采集调试信息不再内联保存在记录里"""
+    job.pop('debug_info', None)
+    return job
+
+
+@dataclass
+class Store:
+    path: str
+    steps: List[Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]]
+    indent: int
+    version: StoreVersion
+    changes: ChangeLog
+
+    @property
+    def schema_file(self) -> str:
+        return self.path + '.schema'
+
+    @property
+    def latest(self) -> int:
+        return len(self.steps)
+
+
+# 步骤只能追加，不能修改或调整顺序（已迁移的存储按版本号跳过前面的步骤）
+STORES: Dict[str, Store] = {
+    "jobs": Store(
+        path=DATA_FILE,
+        steps=[backfill_scraped_at, canonicalize_job_id, drop_debug_info],
+        indent=4,
+        version=StoreVersion(DATA_FILE),
+        changes=ChangeLog(os.path.splitext(DATA_FILE)[0] + "_changes.jsonl"),
+    ),
+    "tracked": Store(
+        path=os.path.abspath(TRACKED_JOBS_FILE),
+        steps=[canonicalize_job_id],
+        indent=2,
+        version=track_version,
+        changes=track_changes,
+    ),
+}
+
+
+# ---------- 流式写出 ----------
+
+def _format_record(record: Dict[str, Any], indent: int) -> str:
+    """与 json.dump(list, indent=indent) 输出的数组元素格式一致"""
+    pad = ' ' * indent
+    return pad + json.dumps(record, ensure_ascii=False, indent=indent).replace('\n', '\n' + pad)
+
+
+# ---------- 运行器 ----------
+
+def schema_version(store: Store) -> int:
+    try:
+        with open(store.schema_file, 'r', encoding='utf-8') as f:
+            return int(json.load(f)['version'])
+    except (OSError, ValueError, KeyError, TypeError):
+        return 0
+
+
+def _set_schema_version(store: Store, version: int) -> None:
+    atomic_write_json(store.schema_file, {
+        'version': version,
+        'migrated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    })
+
+
+def _source_stat(path: str) -> List[int]:
+    st = os.stat(path)
+    return [st.st_ino, st.st_mtime_ns, st.st_size]
+
+
+def _load_checkpoint(checkpoint_file: str, tmp_file: str, expected: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """检查点只有在源文件未被改动、目标版本一致且临时文件完整时才可用"""
+    try:
+        with open(checkpoint_file, 'r', encoding='utf-8') as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if any(checkpoint.get(k) != v for k, v in expected.items()):
+        return None
+    if not os.path.exists(tmp_file) or os.path.getsize(tmp_file) < checkpoint['output_size']:
+        return None
+    return checkpoint
+
+
+def pending_steps(store: Store) -> int:
+    return max(store.latest - schema_version(store), 0)
+
+
+def migrate(name: str) -> Dict[str, Any]:
+    """把一个存储迁移到最新 schema 版本，返回统计信息"""
+    store = STORES[name]
+    tmp_file = store.path + '.migrating'
+    checkpoint_file = store.path + '.migrating.checkpoint'
+
+    with store_lock(store.path):
+        current = schema_version(store)
+        if current >= store.latest:
+            return {'store': name, 'from': current, 'to': current, 'records': 0, 'changed': 0}
+        if not os.path.exists(store.path):
+            # 服务新建的存储本身就是最新格式
+            _set_schema_version(store, store.latest)
+            return {'store': name, 'from': current, 'to': store.latest, 'records': 0, 'changed': 0}
+
+        steps = store.steps[current:]
+        expected = {'from': current, 'to': store.latest, 'source': _source_stat(store.path)}
+        checkpoint = _load_checkpoint(checkpoint_file, tmp_file, expected)
+        if checkpoint:
+            print(f"[{name}] Resuming from checkpoint: {checkpoint['records']} records done")
+        else:
+            checkpoint = {**expected, 'input_offset': 0, 'output_size': 0, 'records': 0, 'written': 0, 'changed': 0}
+
+        with open(tmp_file, 'r+b' if checkpoint['output_size'] else 'wb') as out:
+            out.truncate(checkpoint['output_size'])
+            out.seek(checkpoint['output_size'])
+            if checkpoint['output_size'] == 0:
+                out.write(b'[')
+
+            for record, offset in iter_records(store.path, checkpoint['input_offset'], CHUNK_SIZE):
+                before = json.dumps(record, sort_keys=True, ensure_ascii=False)
+                for step in steps:
+                    record = step(record)
+                    if record is None:
+                        break
+                if record is None or json.dumps(record, sort_keys=True, ensure_ascii=False) != before:
+                    checkpoint['changed'] += 1
+                if record is not None:
+                    out.write(((',\n' if checkpoint['written'] else '\n') + _format_record(record, store.indent)).encode('utf-8'))
+                    checkpoint['written'] += 1
+                checkpoint['records'] += 1
+                checkpoint['input_offset'] = offset
+
+                if checkpoint['records'] % CHECKPOINT_EVERY == 0:
+                    out.flush()
+                    os.fsync(out.fileno())
+                    checkpoint['output_size'] = out.tell()
+                    atomic_write_json(checkpoint_file, checkpoint)
+
+            out.write(b'\n]' if checkpoint['written'] else b']')
+            out.flush()
+            os.fsync(out.fileno())
+
+        if checkpoint['changed']:
+            os.replace(tmp_file, store.path)
+            store.version.bump()
+            # 记录被整体改写，增量日志无法描述这些变化：让客户端和匹配索引全量重新同步
+            store.changes.invalidate()
+        else:
+            os.remove(tmp_file)
+        _set_schema_version(store, store.latest)
+        if os.path.exists(checkpoint_file):
+            os.remove(checkpoint_file)
+
+    return {'store': name, 'from': current, 'to': store.latest,
+            'records': checkpoint['records'], 'changed': checkpoint['changed']}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate the JSON stores to the latest schema version.")
+    parser.add_argument('stores', nargs='*', help=f"stores to migrate: {', '.join(STORES)} (default: all)")
+    parser.add_argument('--status', action='store_true', help="only show schema versions")
+    args = parser.parse_args()
+    unknown = [name for name in args.stores if name not in STORES]
+    if unknown:
+        parser.error(f"unknown store(s): {', '.join(unknown)}")
+
+    for name in args.stores or list(STORES):
+        store = STORES[name]
+        if args.status:
+            print(f"{name}: schema v{schema_version(store)} (latest v{store.latest}), {pending_steps(store)} pending step(s)")
+            continue
+        result = migrate(name)
+        if result['from'] == result['to']:
+            print(f"{name}: already at schema v{result['to']}")
+        else:
+            print(f"{name}: v{result['from']} -> v{result['to']}, "
+                  f"{result['changed']} of {result['records']} records updated")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Store Lock - 跨进程的存储互斥与原子写入
+uvicorn --workers N 时每个 worker 都是独立进程，JSON 存储的"读-改-写"必须持有
+<文件>.lock 上的 flock 排他锁；写入先落到临时文件再 os.replace，读者永远看不到写了一半的文件。
+大的 JSON 数组存储用 iter_records 逐条流式读取（迁移与列式导出共用）。
+"""
+import codecs
+import errno
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, List, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def _lock_fd(fd: int, blocking: bool) -> bool:
+    """blocking=True 时一直等到拿到锁（只会返回 True 或抛出异常）；否则拿不到锁立即返回 False"""
+    if fcntl is not None:
+        flags = fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB)
+        try:
+            fcntl.flock(fd, flags)
+            return True
+        except BlockingIOError:
+            return False
+    mode = msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK
+    while True:
+        try:
+            msvcrt.locking(fd, mode, 1)
+            return True
+        except OSError as e:
+            if not blocking:
+                return False
+            # LK_LOCK 重试约 10 秒后放弃（EDEADLOCK），阻塞锁继续等待；其他错误照常抛出
+            if e.errno != errno.EDEADLOCK:
+                raise
+
+
+def _unlock_fd(fd: int) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def store_lock(path: str):
+    """阻塞获取 path 对应的排他锁（同进程的不同线程之间同样互斥）"""
+    fd = os.open(path + '.lock', os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if not _lock_fd(fd, blocking=True):
+            raise OSError(f"failed to lock {path}.lock")
+        try:
+            yield
+        finally:
+            _unlock_fd(fd)
+    finally:
+        os.close(fd)
+
+
+class TryLock:
+    """非阻塞锁，用于选出唯一的队列处理进程；持有期间保持文件描述符打开"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    def acquire(self) -> bool:
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if _lock_fd(fd, blocking=False):
+            self._fd = fd
+            return True
+        os.close(fd)
+        return False
+
+    def release(self) -> None:
+        if self._fd is not None:
+            _unlock_fd(self._fd)
+            os.close(self._fd)
+            self._fd = None
+
+
+def atomic_write_json(path: str, data: Any, indent: int = 4) -> None:
+    """写入同目录临时文件、fsync 后原子替换目标文件"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def iter_records(path: str, offset: int = 0, chunk_size: int = 1 << 20) -> Iterator[Tuple[Dict[str, Any], int]]:
+    """
+    逐条读取 JSON 数组中的对象，产出 (记录, 该记录之后的字节偏移)。
+    offset 为上次产出的偏移（0 表示从文件开头读取）；每次读取 chunk_size 字节，内存占用与单条记录大小相关。
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        buf, idx, eof = '', 0, False
+        expect_open = offset == 0
+
+        def fill() -> bool:
+            nonlocal buf, idx, eof
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buf = buf[idx:] + utf8.decode(chunk, final=eof)
+            idx = 0
+            return not eof
+
+        fill()
+        while True:
+            # 跳过空白和分隔符
+            while True:
+                while idx < len(buf) and buf[idx] in ' \t\r\n,':  # 均为单字节字符
+                    offset += 1
+                    idx += 1
+                if idx < len(buf) or not fill():
+                    break
+            if idx >= len(buf):
+                raise ValueError(f"{path}: unexpected end of file")
+            if expect_open:
+                if buf[idx] != '[':
+                    raise ValueError(f"{path}: not a JSON array")
+                idx += 1
+                offset += 1
+                expect_open = False
+                continue
+            if buf[idx] == ']':
+                return
+            while True:
+                try:
+                    record, end = decoder.raw_decode(buf, idx)
+                    break
+                except json.JSONDecodeError:
+                    if not fill():
+                        raise
+            if not isinstance(record, dict):
+                raise ValueError(f"{path}: array item at byte {offset} is not an object")
+            offset += len(buf[idx:end].encode('utf-8'))
+            idx = end
+            yield record, offset
+
+
+class JsonlFollower:
+    """
+    增量读取由多个进程追加的 JSONL 日志。
+    记录已读到的偏移量；文件被替换（压缩）或截断时返回 reset=True，由调用方清空状态后重放全文。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._ident: Optional[Tuple[int, int]] = None
+        self._offset = 0
+
+    def read_new(self) -> Tuple[bool, List[Any]]:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            reset = self._ident is not None
+            self._ident, self._offset = None, 0
+            return reset, []
+
+        ident = (st.st_dev, st.st_ino)
+        reset = ident != self._ident or st.st_size < self._offset
+        if reset:
+            self._offset = 0
+        self._ident = ident
+        if st.st_size == self._offset:
+            return reset, []
+
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset)
+            data = f.read()
+        end = data.rfind(b'\n') + 1  # 只消费完整的行
+        self._offset += end
+        entries = []
+        for line in data[:end].splitlines():
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue  # 崩溃时写了一半的行
+        return reset, entries
+
+    def mark_written(self) -> None:
+        """调用方在持锁状态下追加/重写后调用，跳过自己刚写入的内容"""
+        st = os.stat(self.path)
+        self._ident = (st.st_dev, st.st_ino)
+        self._offset = st.st_size
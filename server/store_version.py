@@ -0,0 +1,59 @@
+"""
+Store Version - JSON 存储的单调递增版本号
+计数器保存在 <文件>.version 中，所有 worker 进程看到的是同一个值；每次写入在持有存储锁时 bump。
+ETag 由计数器加数据文件的 mtime 组成，文件被外部改动（手工编辑、迁移脚本）时同样会变化。
+"""
+import os
+import threading
+from datetime import datetime, timezone
+
+from store_lock import atomic_write_json
+
+
+class StoreVersion:
+    def __init__(self, path: str):
+        self.path = path
+        self.version_file = path + '.version'
+        self._cached = (None, 0)  # (version 文件 stat, 值)
+        self._lock = threading.Lock()
+
+    def _stat_of(self, path: str):
+        try:
+            st = os.stat(path)
+            return (st.st_ino, st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def _read(self) -> int:
+        stat = self._stat_of(self.version_file)
+        with self._lock:
+            if stat == self._cached[0]:
+                return self._cached[1]
+            try:
+                with open(self.version_file, 'r', encoding='utf-8') as f:
+                    value = int(f.read().strip() or 0)
+            except (OSError, ValueError):
+                value = 0
+            self._cached = (stat, value)
+            return value
+
+    def bump(self) -> int:
+        """写入完成后调用，调用方需持有该存储的 store_lock"""
+        value = self._read() + 1
+        atomic_write_json(self.version_file, value)
+        return value
+
+    def current(self) -> int:
+        return self._read()
+
+    @property
+    def tag(self) -> str:
+        stat = self._stat_of(self.path)
+        return f"{self.current()}.{format(stat[1], 'x') if stat else 0}"
+
+    @property
+    def modified_at(self) -> datetime:
+        stat = self._stat_of(self.path) or self._stat_of(self.version_file)
+        if stat is None:
+            return datetime.fromtimestamp(0, timezone.utc)
+        return datetime.fromtimestamp(stat[1] / 1e9, timezone.utc)
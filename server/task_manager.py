@@ -1,53 +1,162 @@
 import asyncio
 import json
 import os
+from contextlib import contextmanager
 from typing import List, Optional, Dict
 from datetime import datetime
 from scraper import scraper
+from dedup_index import DedupIndex
+from store_version import StoreVersion
+from change_log import ChangeLog
+from store_lock import store_lock, atomic_write_json, TryLock
+from track_manager import extract_job_id
+
+# Finished tasks kept in the shared state file (oldest are pruned first)
+MAX_FINISHED_TASKS = 2000
 
 # Type definitions
 class JobTask:
-    def __init__(self, url: str):
+    def __init__(self, url: str, dedup_mode: str = "flag"):
         self.id = url # Use URL as ID for simplicity in deduplication
         self.url = url
-        self.status = "pending" # pending, processing, completed, failed
+        self.status = "pending" # pending, processing, completed, failed, skipped
         self.result = None
         self.error = None
+        self.dedup_mode = dedup_mode # off, flag, skip (near-duplicate JD handling)
+        self.duplicate_of = None
         self.created_at = datetime.now().isoformat()
         self.updated_at = datetime.now().isoformat()
 
+    @classmethod
+    def from_dict(cls, data: dict) -> "JobTask":
+        task = cls(data["url"])
+        task.__dict__.update(data)
+        return task
+
 class TaskManager:
+    """
+    Queue and task state live in a shared JSON file (<data>_tasks.json) so that every
+    uvicorn worker sees the same queue and can answer /api/tasks/status. Only the worker
+    holding the processor lock runs the browser and drains the queue.
+    """
+
     def __init__(self, data_file: str):
-        self.queue = asyncio.Queue()
-        self.tasks: Dict[str, JobTask] = {}
         self.data_file = data_file
+        base = os.path.splitext(data_file)[0]
+        self.state_file = base + "_tasks.json"
         self.is_running = False
+        self._processor_lock = TryLock(self.state_file + ".processor.lock")
+        # Near-duplicate JD index, persisted next to the data file
+        self.dedup_index = DedupIndex(base + "_dedup.jsonl")
+        # Versions drive ETags / response caching of the list endpoints
+        self.jobs_version = StoreVersion(data_file)
+        self.status_version = StoreVersion(self.state_file)
+        # Delta feed for /api/jobs/changes
+        self.job_changes = ChangeLog(base + "_changes.jsonl")
+
+    # ---------- Shared task state ----------
+
+    def _load_state(self) -> dict:
+        if os.path.exists(self.state_file):
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                try:
+                    return json.load(f)
+                except json.JSONDecodeError:
+                    pass
+        return {"tasks": {}, "queue": []}
+
+    @contextmanager
+    def _state(self):
+        """Locked read-modify-write of the task state; saved on normal exit."""
+        with store_lock(self.state_file):
+            state = self._load_state()
+            yield state
+            self._prune(state)
+            atomic_write_json(self.state_file, state, indent=2)
+            self.status_version.bump()
+
+    def _prune(self, state: dict):
+        finished = [t for t in state["tasks"].values() if t["status"] in ("completed", "failed", "skipped")]
+        if len(finished) > MAX_FINISHED_TASKS:
+            finished.sort(key=lambda t: t["updated_at"])
+            for t in finished[:len(finished) - MAX_FINISHED_TASKS]:
+                del state["tasks"][t["url"]]
 
-    def add_tasks(self, urls: List[str]):
+    @property
+    def tasks(self) -> Dict[str, JobTask]:
+        """Snapshot of all tasks (read-only; the state file is replaced atomically)."""
+        return {url: JobTask.from_dict(t) for url, t in self._load_state()["tasks"].items()}
+
+    def queue_length(self) -> int:
+        return len(self._load_state()["queue"])
+
+    def _update_task(self, task: JobTask):
+        task.updated_at = datetime.now().isoformat()
+        with self._state() as state:
+            state["tasks"][task.url] = {**task.__dict__, "result": None}
+
+    # ---------- Queue ----------
+
+    def _enqueue(self, urls: List[str], dedup_mode: str) -> int:
         added_count = 0
-        for url in urls:
-            url = url.strip()
-            if not url:
-                continue
-            # Simple deduplication: if pending or processing, don't add
-            if url in self.tasks and self.tasks[url].status in ["pending", "processing"]:
-                continue
-            
-            task = JobTask(url)
-            self.tasks[url] = task
-            self.queue.put_nowait(task)
-            added_count += 1
-            
+        with self._state() as state:
+            for url in urls:
+                url = url.strip()
+                if not url:
+                    continue
+                # Simple deduplication: if pending or processing, don't add
+                existing = state["tasks"].get(url)
+                if existing and existing["status"] in ["pending", "processing"]:
+                    continue
+
+                task = JobTask(url, dedup_mode)
+                state["tasks"][url] = task.__dict__
+                state["queue"].append(url)
+                added_count += 1
+        return added_count
+
+    async def add_tasks(self, urls: List[str], dedup_mode: str = "flag") -> int:
+        # File locking and fsync block, so they run off the event loop
+        added_count = await asyncio.to_thread(self._enqueue, urls, dedup_mode)
+
         if not self.is_running and added_count > 0:
             asyncio.create_task(self.process_queue())
-        
+
         return added_count
 
+    def _claim_next(self) -> Optional[JobTask]:
+        """Pops the queue head and marks it processing."""
+        with self._state() as state:
+            while state["queue"]:
+                url = state["queue"].pop(0)
+                data = state["tasks"].get(url)
+                if data is None or data["status"] != "pending":
+                    continue
+                data["status"] = "processing"
+                data["updated_at"] = datetime.now().isoformat()
+                return JobTask.from_dict(data)
+        return None
+
+    def _recover_interrupted(self):
+        """Tasks left 'processing' by a crashed processor go back to the front of the queue."""
+        with self._state() as state:
+            stale = [url for url, t in state["tasks"].items() if t["status"] == "processing"]
+            for url in stale:
+                state["tasks"][url]["status"] = "pending"
+            state["queue"] = stale + [url for url in state["queue"] if url not in stale]
+
     async def process_queue(self):
+        if self.is_running:
+            return
+        # Only one worker process may drive the browser; the others just enqueue
+        if not self._processor_lock.acquire():
+            return
+        finished_normally = False
         try:
             self.is_running = True
             print("Starting queue processor...")
-            
+            await asyncio.to_thread(self._recover_interrupted)
+
             # Ensure browser is started
             try:
                 await scraper.start_browser()
@@ -55,136 +164,201 @@ class TaskManager:
                 print(f"Failed to start browser: {e}")
                 return # Exit if browser fails, finally block will reset is_running
 
-            while not self.queue.empty():
-                task: JobTask = await self.queue.get()
-                
+            while True:
+                task = await asyncio.to_thread(self._claim_next)
+                if task is None:
+                    break
+
                 try:
-                    task.status = "processing"
-                    task.updated_at = datetime.now().isoformat()
-                    
                     print(f"Processing: {task.url}")
                     data = await scraper.scrape_job(task.url)
-                    
+
+                    if task.dedup_mode != "off":
+                        stored = await asyncio.to_thread(self._find_saved, data.get('job_url') or task.url)
+                        if stored is not None:
+                            # A re-scrape is only compared with jobs saved before it (its flag is kept): checking it
+                            # against its own near-duplicate twins would skip the refresh or make both flag each other
+                            if stored.get('duplicate_of'):
+                                data['duplicate_of'] = stored['duplicate_of']
+                        else:
+                            duplicates = await asyncio.to_thread(self.dedup_index.find_duplicates, data)
+                            if duplicates:
+                                task.duplicate_of = duplicates[0]['job_url']
+                                if task.dedup_mode == "skip":
+                                    task.status = "skipped"
+                                    print(f"Skipped near-duplicate of {task.duplicate_of}")
+                                    continue
+                                data['duplicate_of'] = task.duplicate_of
+
                     task.status = "completed"
-                    task.result = data
-                    self.save_result_to_file(data)
-                    
+                    await asyncio.to_thread(self.save_result_to_file, data)
+
                 except Exception as e:
                     task.status = "failed"
                     task.error = str(e)
                     print(f"Task failed: {e}")
                 finally:
-                    task.updated_at = datetime.now().isoformat()
-                    self.queue.task_done()
-                    
+                    await asyncio.to_thread(self._update_task, task)
+
                     # Small delay between tasks to be safe
-                    await asyncio.sleep(2) 
+                    await asyncio.sleep(2)
 
             print("Queue empty. Processor finished.")
-            
+            finished_normally = True
+
         except Exception as e:
             print(f"Queue processor crashed: {e}")
         finally:
             self.is_running = False
+            self._processor_lock.release()
             print("Queue processor stopped (is_running=False).")
 
+        # Another worker may have enqueued after our last claim but before we released the lock
+        if finished_normally and await asyncio.to_thread(self.queue_length) > 0:
+            asyncio.create_task(self.process_queue())
+
+    def _has_unfinished(self) -> bool:
+        state = self._load_state()
+        return bool(state["queue"]) or any(t["status"] == "processing" for t in state["tasks"].values())
+
+    async def resume_pending(self):
+        """Called on startup: picks up tasks queued before a restart."""
+        if await asyncio.to_thread(self._has_unfinished):
+            asyncio.create_task(self.process_queue())
+
+    # ---------- Job store ----------
+
+    def _read_jobs(self) -> list:
+        if os.path.exists(self.data_file):
+            with open(self.data_file, 'r', encoding='utf-8') as f:
+                try:
+                    return json.load(f)
+                except json.JSONDecodeError:
+                    return []
+        return []
+
+    def _find_saved(self, url: str) -> Optional[dict]:
+        """Returns the stored record for url ({} if only the dedup index knows it), or None if it was never saved."""
+        for job in self.get_all_jobs():
+            if job.get('job_url') == url:
+                return job
+        return {} if url in self.dedup_index else None
+
     def save_result_to_file(self, data: dict):
         """Appends a new record to the JSON file, replacing any existing record with the same URL."""
         try:
-            # Read existing
-            if os.path.exists(self.data_file):
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    try:
-                        current_data = json.load(f)
-                    except json.JSONDecodeError:
-                        current_data = []
-            else:
-                current_data = []
-
-            # Remove existing record with the same URL (deduplication - keep only latest)
-            new_url = data.get('job_url')
-            if new_url:
-                current_data = [job for job in current_data if job.get('job_url') != new_url]
-
-            # Append the new (latest) result
-            current_data.append(data)
-
-            # Write back
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(current_data, f, ensure_ascii=False, indent=4)
-                
+            with store_lock(self.data_file):
+                current_data = self._read_jobs()
+
+                # Remove existing record with the same URL (deduplication - keep only latest)
+                new_url = data.get('job_url')
+                if new_url:
+                    data['job_id'] = extract_job_id(new_url)
+                    current_data = [job for job in current_data if job.get('job_url') != new_url]
+
+                # Append the new (latest) result
+                current_data.append(data)
+
+                # Write back atomically so readers in other workers never see a partial file
+                atomic_write_json(self.data_file, current_data, indent=4)
+                self.jobs_version.bump()
+                self.job_changes.record("upsert", new_url, data)
+
+            # The match index follows job_changes; the dedup index is checked on the next scrape
+            self.dedup_index.add(data)
+
         except Exception as e:
             print(f"Error saving data: {e}")
 
     def get_status_summary(self):
+        tasks = self._load_state()["tasks"].values()
+        active = next((t["url"] for t in tasks if t["status"] == "processing"), None)
         summary = {
-            "queue_length": self.queue.qsize(),
-            "active_task": None, # Could enhance to show current url
-            "completed_count": sum(1 for t in self.tasks.values() if t.status == "completed"),
-            "failed_count": sum(1 for t in self.tasks.values() if t.status == "failed"),
-            "total_tasks": len(self.tasks),
+            "queue_length": sum(1 for t in tasks if t["status"] == "pending"),
+            "active_task": active,
+            "completed_count": sum(1 for t in tasks if t["status"] == "completed"),
+            "failed_count": sum(1 for t in tasks if t["status"] == "failed"),
+            "skipped_count": sum(1 for t in tasks if t["status"] == "skipped"),
+            "total_tasks": len(tasks),
             "recent_logs": [] # Could add logs
         }
         return summary
-    
+
     def get_all_jobs(self):
         """Reads the source of truth JSON file."""
-        if os.path.exists(self.data_file):
-             with open(self.data_file, 'r', encoding='utf-8') as f:
-                    try:
-                        return json.load(f)
-                    except:
-                        return []
-        return []
+        return self._read_jobs()
 
     def delete_jobs(self, urls_to_delete: List[str]):
         """Deletes jobs matching the given URLs."""
         if not os.path.exists(self.data_file):
             return 0
-        
+
         try:
-            with open(self.data_file, 'r', encoding='utf-8') as f:
-                current_data = json.load(f)
-            
-            # Simple filtering
-            original_count = len(current_data)
-            # Filter out jobs where job_url is in the deletion list
-            new_data = [job for job in current_data if job.get('job_url') not in urls_to_delete]
-            deleted_count = original_count - len(new_data)
-            
+            with store_lock(self.data_file):
+                current_data = self._read_jobs()
+
+                # Simple filtering
+                original_count = len(current_data)
+                # Filter out jobs where job_url is in the deletion list
+                new_data = [job for job in current_data if job.get('job_url') not in urls_to_delete]
+                deleted_count = original_count - len(new_data)
+
+                if deleted_count > 0:
+                    deleted_urls = {job.get('job_url') for job in current_data} - {job.get('job_url') for job in new_data}
+                    # Near-duplicate flags pointing at a deleted original no longer mean anything
+                    unflagged = []
+                    for job in new_data:
+                        if job.get('duplicate_of') in deleted_urls:
+                            del job['duplicate_of']
+                            unflagged.append(job)
+
+                    atomic_write_json(self.data_file, new_data, indent=4)
+                    self.jobs_version.bump()
+                    self.job_changes.record_many(
+                        [("delete", url, None) for url in deleted_urls]
+                        + [("upsert", job.get('job_url'), job) for job in unflagged]
+                    )
+
             if deleted_count > 0:
-                with open(self.data_file, 'w', encoding='utf-8') as f:
-                    json.dump(new_data, f, ensure_ascii=False, indent=4)
-            
+                self.dedup_index.remove(urls_to_delete)
+
             return deleted_count
         except Exception as e:
             print(f"Error deleting jobs: {e}")
             return 0
-            
+
     def get_failed_tasks(self) -> List[dict]:
         """Returns a list of failed tasks."""
         return [task.__dict__ for task in self.tasks.values() if task.status == "failed"]
 
-    def retry_tasks(self, urls: List[str]) -> int:
-        """Resets status of specific failed tasks and re-queues them."""
+    def get_skipped_tasks(self) -> List[dict]:
+        """Returns tasks skipped as near-duplicates (dedup_mode=skip), with the job they duplicate."""
+        return [task.__dict__ for task in self.tasks.values() if task.status == "skipped"]
+
+    def _requeue_failed(self, urls: List[str]) -> int:
         count = 0
-        for url in urls:
-            if url in self.tasks:
-                task = self.tasks[url]
-                if task.status == "failed":
-                    task.status = "pending"
-                    task.error = None
-                    task.updated_at = datetime.now().isoformat()
-                    self.queue.put_nowait(task) # Re-add to queue
+        with self._state() as state:
+            for url in urls:
+                task = state["tasks"].get(url)
+                if task and task["status"] == "failed":
+                    task["status"] = "pending"
+                    task["error"] = None
+                    task["updated_at"] = datetime.now().isoformat()
+                    state["queue"].append(url) # Re-add to queue
                     count += 1
-        
+        return count
+
+    async def retry_tasks(self, urls: List[str]) -> int:
+        """Resets status of specific failed tasks and re-queues them."""
+        count = await asyncio.to_thread(self._requeue_failed, urls)
+
         # If queue processor stopped, restart it
         if not self.is_running and count > 0:
             asyncio.create_task(self.process_queue())
-            
+
         return count
 
 # Singleton
-# We need to initialized it with the data file path from main.py, 
+# We need to initialized it with the data file path from main.py,
 # but for now we can defer initialization or use a hardcoded path relative to this file?
 # Better to let main.py initialize it.
@@ -0,0 +1,99 @@
+"""
+迁移：流式读取在块边界切开多字节字符时结果不变，以及中断后从检查点继续得到与一次跑完相同的文件。
+"""
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import migrations  # noqa: E402
+from change_log import ChangeLog  # noqa: E402
+from store_lock import iter_records  # noqa: E402
+from store_version import StoreVersion  # noqa: E402
+
+RECORDS = 50
+
+
+def _records() -> list:
+    # 中文 3 字节、emoji 4 字节，配合很小的块让字符跨块
+    return [
+        {
+            'job_url': f"https://www.zhipin.com/job_detail/id{n}.html",
+            'job_title': f"后端工程师 🚀 {n}",
+            'job_description': '负责"核心"服务\\开发，' * (n % 4),
+            'scraped_at': '2024-01-01 00:00:00',
+            'debug_info': {'trace': '采集 ✓'},
+        }
+        for n in range(RECORDS)
+    ]
+
+
+def _write_store(path: str, records: list) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(records, f, ensure_ascii=False, indent=4)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 5, 64])
+def test_iter_records_handles_multibyte_chunk_boundaries_and_resumes_from_offsets(tmp_path, chunk_size):
+    path = str(tmp_path / 'jobs.json')
+    records = _records()
+    _write_store(path, records)
+
+    read = list(iter_records(path, chunk_size=chunk_size))
+    assert [record for record, _ in read] == records
+    # 从任一产出的偏移继续，都能读到其后的全部记录
+    for i in (0, 1, RECORDS // 2, RECORDS - 1):
+        rest = [record for record, _ in iter_records(path, read[i][1], chunk_size)]
+        assert rest == records[i + 1:]
+
+
+def test_interrupted_migration_resumes_from_checkpoint(tmp_path, monkeypatch):
+    path = str(tmp_path / 'jobs.json')
+    records = _records()
+    _write_store(path, records)
+    monkeypatch.setattr(migrations, 'CHUNK_SIZE', 7)
+    monkeypatch.setattr(migrations, 'CHECKPOINT_EVERY', 8)
+
+    calls = []
+
+    def crash_at(limit):
+        def step(job):
+            calls.append(job['job_url'])
+            if len(calls) == limit:
+                raise KeyboardInterrupt
+            return migrations.drop_debug_info(job)
+        return step
+
+    store = migrations.Store(
+        path=path,
+        steps=[migrations.canonicalize_job_id, crash_at(30)],
+        indent=4,
+        version=StoreVersion(path),
+        changes=ChangeLog(str(tmp_path / 'jobs_changes.jsonl')),
+    )
+    monkeypatch.setitem(migrations.STORES, 'test', store)
+
+    with pytest.raises(KeyboardInterrupt):
+        migrations.migrate('test')
+    with open(path + '.migrating.checkpoint', 'r', encoding='utf-8') as f:
+        assert json.load(f)['records'] == 24
+    assert migrations.schema_version(store) == 0
+
+    calls.clear()
+    store.steps[1] = crash_at(0)
+    result = migrations.migrate('test')
+    # 只处理检查点之后的记录
+    assert len(calls) == RECORDS - 24
+    assert result == {'store': 'test', 'from': 0, 'to': 2, 'records': RECORDS, 'changed': RECORDS}
+
+    expected = [migrations.drop_debug_info(migrations.canonicalize_job_id(record)) for record in _records()]
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    assert json.loads(text) == expected
+    assert text == json.dumps(expected, ensure_ascii=False, indent=4)
+    assert migrations.schema_version(store) == 2
+    assert not os.path.exists(path + '.migrating')
+    assert not os.path.exists(path + '.migrating.checkpoint')
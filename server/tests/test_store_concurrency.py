@@ -0,0 +1,83 @@
+"""
+多进程并发写入压力测试：N 个进程同时写岗位存储与追踪列表，验证没有丢失写入、
+变更日志序号唯一且递增。
+"""
+import json
+import multiprocessing
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import track_manager  # noqa: E402
+from change_log import ChangeLog  # noqa: E402
+from store_version import StoreVersion  # noqa: E402
+from task_manager import TaskManager  # noqa: E402
+
+WORKERS = 6
+WRITES_PER_WORKER = 30
+DELETES_PER_WORKER = 5
+
+
+def _use_tmp_track_store(tmp_dir: str) -> None:
+    """把追踪列表模块指向临时目录（各进程各自设置）"""
+    track_manager.TRACKED_JOBS_FILE = os.path.join(tmp_dir, 'tracked_jobs.json')
+    track_manager.DELETED_ITEMS_FILE = os.path.join(tmp_dir, 'tracked_jobs_deleted.json')
+    track_manager.track_version = StoreVersion(track_manager.TRACKED_JOBS_FILE)
+    track_manager.track_changes = ChangeLog(os.path.join(tmp_dir, 'tracked_jobs_changes.jsonl'))
+
+
+def _url(worker: int, n: int) -> str:
+    return f"https://www.zhipin.com/job_detail/w{worker}n{n}.html"
+
+
+def _writer(tmp_dir: str, worker: int) -> None:
+    _use_tmp_track_store(tmp_dir)
+    task_manager = TaskManager(os.path.join(tmp_dir, 'job_details.json'))
+    for n in range(WRITES_PER_WORKER):
+        job = {'job_url': _url(worker, n), 'job_title': f'岗位 {worker}-{n}', 'company_name': '公司'}
+        task_manager.save_result_to_file(job)
+        track_manager.add_to_track(job)
+    task_manager.delete_jobs([_url(worker, n) for n in range(DELETES_PER_WORKER)])
+
+
+def _seqs(log_file: str):
+    with open(log_file, 'r', encoding='utf-8') as f:
+        return [entry['seq'] for entry in map(json.loads, f) if 'seq' in entry]
+
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason="needs fork")
+def test_concurrent_writers_lose_no_writes(tmp_path):
+    ctx = multiprocessing.get_context('fork')
+    processes = [ctx.Process(target=_writer, args=(str(tmp_path), worker)) for worker in range(WORKERS)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=120)
+        assert process.exitcode == 0
+
+    with open(tmp_path / 'job_details.json', 'r', encoding='utf-8') as f:
+        jobs = json.load(f)
+    expected_urls = {
+        _url(worker, n)
+        for worker in range(WORKERS)
+        for n in range(DELETES_PER_WORKER, WRITES_PER_WORKER)
+    }
+    assert len(jobs) == len(expected_urls)
+    assert {job['job_url'] for job in jobs} == expected_urls
+
+    with open(tmp_path / 'tracked_jobs.json', 'r', encoding='utf-8') as f:
+        tracked = json.load(f)
+    assert len(tracked) == WORKERS * WRITES_PER_WORKER
+    assert len({job['job_id'] for job in tracked}) == len(tracked)
+
+    job_seqs = _seqs(tmp_path / 'job_details_changes.jsonl')
+    assert job_seqs == list(range(1, WORKERS * (WRITES_PER_WORKER + DELETES_PER_WORKER) + 1))
+    track_seqs = _seqs(tmp_path / 'tracked_jobs_changes.jsonl')
+    assert track_seqs == list(range(1, WORKERS * WRITES_PER_WORKER + 1))
+
+    # 版本计数器同样不能丢失 bump：每次写入恰好 +1
+    assert StoreVersion(str(tmp_path / 'job_details.json')).current() == WORKERS * (WRITES_PER_WORKER + 1)
+    assert StoreVersion(str(tmp_path / 'tracked_jobs.json')).current() == WORKERS * WRITES_PER_WORKER
@@ -1,7 +1,9 @@
 """
 Track Manager - 岗位追踪管理模块
 负责 tracked_jobs.json 的读写和业务逻辑
+所有"读-改-写"都在 store_lock 内完成，写入为原子替换，支持多 worker 进程并发访问
 """
+import hashlib
 import json
 import re
 import os
@@ -9,6 +11,10 @@ from datetime import datetime
 from typing import Optional, List, Dict, Any
 from enum import Enum
 
+from store_version import StoreVersion
+from change_log import ChangeLog
+from store_lock import store_lock, atomic_write_json
+
 TRACKED_JOBS_FILE = os.path.join(os.path.dirname(__file__), '..', 'tracked_jobs.json')
 
 class TrackStatus(str, Enum):
@@ -27,8 +33,14 @@ class Priority(str, Enum):
     MEDIUM = "medium"
     LOW = "low"
 
-# 临时存储已删除的项（用于撤销）
-_deleted_items: Dict[str, Dict[str, Any]] = {}
+# 追踪列表版本号（用于 ETag / 响应缓存）
+track_version = StoreVersion(TRACKED_JOBS_FILE)
+
+# 追踪列表增量变更日志（用于 /api/track/changes）
+track_changes = ChangeLog(os.path.join(os.path.dirname(__file__), '..', 'tracked_jobs_changes.jsonl'))
+
+# 已删除的项（用于撤销），存文件以便任意 worker 都能撤销
+DELETED_ITEMS_FILE = os.path.join(os.path.dirname(__file__), '..', 'tracked_jobs_deleted.json')
 
 def extract_job_id(job_url: str) -> str:
     """从 Boss 直聘 URL 中提取 job_id"""
@@ -40,8 +52,8 @@ def extract_job_id(job_url: str) -> str:
     match = re.search(r'jid=([^&]+)', job_url)
     if match:
         return match.group(1)
-    # 如果无法提取，使用 URL 的 hash 作为 ID
-    return str(hash(job_url))
+    # 如果无法提取，使用 URL 的稳定 hash 作为 ID（内置 hash() 每个进程的结果不同）
+    return hashlib.md5(job_url.encode('utf-8')).hexdigest()[:16]
 
 def load_tracked_jobs() -> List[Dict[str, Any]]:
     """加载追踪列表"""
@@ -54,9 +66,27 @@ def load_tracked_jobs() -> List[Dict[str, Any]]:
         return []
 
 def save_tracked_jobs(jobs: List[Dict[str, Any]]) -> None:
-    """保存追踪列表"""
-    with open(TRACKED_JOBS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(jobs, f, ensure_ascii=False, indent=2)
+    """保存追踪列表（调用方需持有 store_lock(TRACKED_JOBS_FILE)）"""
+    atomic_write_json(TRACKED_JOBS_FILE, jobs, indent=2)
+    track_version.bump()
+
+def _load_deleted_items() -> Dict[str, Dict[str, Any]]:
+    if not os.path.exists(DELETED_ITEMS_FILE):
+        return {}
+    try:
+        with open(DELETED_ITEMS_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return {}
+
+def _save_deleted_items(items: Dict[str, Dict[str, Any]]) -> None:
+    # 顺带清理已超过撤销时限的记录
+    now = datetime.now()
+    items = {
+        job_id: info for job_id, info in items.items()
+        if (now - datetime.fromisoformat(info['deleted_at'])).total_seconds() <= 30
+    }
+    atomic_write_json(DELETED_ITEMS_FILE, items, indent=2)
 
 def add_to_track(job_data: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -64,38 +94,41 @@ def add_to_track(job_data: Dict[str, Any]) -> Dict[str, Any]:
     job_data 应包含: job_url, job_title, company_name
     返回新创建的追踪记录
     """
-    jobs = load_tracked_jobs()
     job_id = extract_job_id(job_data['job_url'])
-    
-    # 检查是否已存在
-    for job in jobs:
-        if job.get('job_id') == job_id:
-            raise ValueError(f"岗位已在追踪列表中: {job_data.get('job_title', job_id)}")
-    
-    # 创建追踪记录
-    tracked_job = {
-        'job_id': job_id,
-        'job_url': job_data['job_url'],
-        'job_title': job_data.get('job_title', ''),
-        'company_name': job_data.get('company_name', ''),
-        
-        # 追踪专有字段
-        'track_status': TrackStatus.PENDING.value,
-        'priority': Priority.MEDIUM.value,
-        'added_at': datetime.now().isoformat(),
-        'applied_at': None,
-        'interview_at': None,
-        'notes': '',
-        
-        # 分析型标签（预留）
-        'analysis_tags': {
-            'risk_level': None,
-            'match_score': None
+
+    with store_lock(TRACKED_JOBS_FILE):
+        jobs = load_tracked_jobs()
+
+        # 检查是否已存在
+        for job in jobs:
+            if job.get('job_id') == job_id:
+                raise ValueError(f"岗位已在追踪列表中: {job_data.get('job_title', job_id)}")
+
+        # 创建追踪记录
+        tracked_job = {
+            'job_id': job_id,
+            'job_url': job_data['job_url'],
+            'job_title': job_data.get('job_title', ''),
+            'company_name': job_data.get('company_name', ''),
+
+            # 追踪专有字段
+            'track_status': TrackStatus.PENDING.value,
+            'priority': Priority.MEDIUM.value,
+            'added_at': datetime.now().isoformat(),
+            'applied_at': None,
+            'interview_at': None,
+            'notes': '',
+
+            # 分析型标签（预留）
+            'analysis_tags': {
+                'risk_level': None,
+                'match_score': None
+            }
         }
-    }
-    
-    jobs.append(tracked_job)
-    save_tracked_jobs(jobs)
+
+        jobs.append(tracked_job)
+        save_tracked_jobs(jobs)
+        track_changes.record('upsert', job_id, tracked_job)
     return tracked_job
 
 def update_track(job_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -103,18 +136,20 @@ def update_track(job_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any
     更新追踪记录
     updates 可包含: track_status, priority, applied_at, interview_at, notes
     """
-    jobs = load_tracked_jobs()
-    
-    for job in jobs:
-        if job.get('job_id') == job_id:
-            # 只允许更新特定字段
-            allowed_fields = ['track_status', 'priority', 'applied_at', 'interview_at', 'notes']
-            for field in allowed_fields:
-                if field in updates:
-                    job[field] = updates[field]
-            save_tracked_jobs(jobs)
-            return job
-    
+    with store_lock(TRACKED_JOBS_FILE):
+        jobs = load_tracked_jobs()
+
+        for job in jobs:
+            if job.get('job_id') == job_id:
+                # 只允许更新特定字段
+                allowed_fields = ['track_status', 'priority', 'applied_at', 'interview_at', 'notes']
+                for field in allowed_fields:
+                    if field in updates:
+                        job[field] = updates[field]
+                save_tracked_jobs(jobs)
+                track_changes.record('upsert', job_id, job)
+                return job
+
     return None
 
 def delete_from_track(job_id: str) -> bool:
@@ -122,19 +157,22 @@ def delete_from_track(job_id: str) -> bool:
     从追踪列表删除（支持 30s 撤销）
     返回是否删除成功
     """
-    global _deleted_items
-    jobs = load_tracked_jobs()
-    
-    for i, job in enumerate(jobs):
-        if job.get('job_id') == job_id:
-            deleted_job = jobs.pop(i)
-            _deleted_items[job_id] = {
-                'job': deleted_job,
-                'deleted_at': datetime.now().isoformat()
-            }
-            save_tracked_jobs(jobs)
-            return True
-    
+    with store_lock(TRACKED_JOBS_FILE):
+        jobs = load_tracked_jobs()
+
+        for i, job in enumerate(jobs):
+            if job.get('job_id') == job_id:
+                deleted_job = jobs.pop(i)
+                deleted_items = _load_deleted_items()
+                deleted_items[job_id] = {
+                    'job': deleted_job,
+                    'deleted_at': datetime.now().isoformat()
+                }
+                _save_deleted_items(deleted_items)
+                save_tracked_jobs(jobs)
+                track_changes.record('delete', job_id)
+                return True
+
     return False
 
 def undo_delete(job_id: str) -> Optional[Dict[str, Any]]:
@@ -142,26 +180,24 @@ def undo_delete(job_id: str) -> Optional[Dict[str, Any]]:
     撤销删除（30s 内有效）
     返回恢复的记录，如果超时或不存在则返回 None
     """
-    global _deleted_items
-    
-    if job_id not in _deleted_items:
-        return None
-    
-    deleted_info = _deleted_items[job_id]
-    deleted_at = datetime.fromisoformat(deleted_info['deleted_at'])
-    
-    # 检查是否在 30s 内
-    if (datetime.now() - deleted_at).total_seconds() > 30:
-        del _deleted_items[job_id]
-        return None
-    
-    # 恢复记录
-    job = deleted_info['job']
-    jobs = load_tracked_jobs()
-    jobs.append(job)
-    save_tracked_jobs(jobs)
-    
-    del _deleted_items[job_id]
+    with store_lock(TRACKED_JOBS_FILE):
+        deleted_items = _load_deleted_items()
+        deleted_info = deleted_items.pop(job_id, None)
+        if deleted_info is None:
+            return None
+        _save_deleted_items(deleted_items)
+
+        # 检查是否在 30s 内
+        deleted_at = datetime.fromisoformat(deleted_info['deleted_at'])
+        if (datetime.now() - deleted_at).total_seconds() > 30:
+            return None
+
+        # 恢复记录
+        job = deleted_info['job']
+        jobs = load_tracked_jobs()
+        jobs.append(job)
+        save_tracked_jobs(jobs)
+        track_changes.record('upsert', job_id, job)
     return job
 
 def get_all_tracked_jobs() -> List[Dict[str, Any]]: